@@ -1,54 +1,721 @@
-'''
-Author: Bobby Jones
-Date: 2/27/25
-Description: Reads in data from a txt file and puts it into a csv file
-Bugs: None
-Sources: https://www.geeksforgeeks.org/split-and-parse-a-string-in-python/
-'''
-import csv
-
-def fixed_length_to_csv(input_file, output_file):
-    """
-    Reads a fixed-length formatted text file, extracts fields using slicing,
-    and writes the formatted data to a CSV file.
-
-    Args:
-        input_file (str): Path to the input fixed-length text file.
-        output_file (str): Path to the output CSV file.
-
-    """
-    # Define column widths and their starting positions
-    columns = [
-        (0, 6), #ID
-        (6, 21), #First Name
-        (21, 36), #Last Name
-        (36, 42),    #Grade
-        (42, 46),      #GPA
-        (48, 58), #Bday
-        (60, 66),    #Gender
-        (67, 76),#Class Rank
-        (76, 86), #Attendance Parcentage
-        (86, 93),    #Honors
-        (93, 102),   #Sports
-        (102, 112) #Club Count
-    ]
-
-    # Read the fixed-length text file
-    with open(input_file, 'r') as infile, open(output_file, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-
-        # Write header
-
-        # Process each line in the file
-        for line in infile:
-            row = [line[col[0]:col[1]].strip() for col in columns]
-            writer.writerow(row)
-
-# File paths
-input_path = r"C:\Users\bjones25\Downloads\student_data_cs2.txt"
-output_path = r"C:\Users\bjones25\Downloads\fixed_length_conversion_bobby_jones.csv"
-
-# Run the function
-fixed_length_to_csv(input_path, output_path)
-
-print(f"CSV file successfully created: {output_path}")
+'''
+Author: Bobby Jones
+Date: 2/27/25
+Description: Reads in data from a txt file and puts it into a csv file
+Bugs: None
+Sources: https://www.geeksforgeeks.org/split-and-parse-a-string-in-python/, https://docs.python.org/3/library/mmap.html,
+         https://numpy.org/doc/stable/user/basics.rec.html
+'''
+import argparse
+import csv
+import glob
+import hashlib
+import io
+import json
+import mmap
+import os
+import sys
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from operator import itemgetter
+
+# Converters from a stripped field to its typed value, keyed by field type
+FIELD_TYPES = {
+    'str': str,
+    'int': int,
+    'float': float,
+    'date': date.fromisoformat,
+    'bool': lambda value: value.upper() in ('Y', 'YES', 'T', 'TRUE', '1'),
+}
+
+# One column of a fixed-length record: its name, starting position, width and type
+Field = namedtuple('Field', ['name', 'offset', 'width', 'type'], defaults=['str'])
+
+
+class RecordLayout:
+    """
+    A fixed-length record layout compiled once from a declarative field spec.
+
+    All of the column slices are precomputed into a single itemgetter, so a
+    whole record is cut apart in one call instead of one slice per column.
+
+    Args:
+        fields (list): Field tuples (or (name, offset, width[, type]) tuples)
+            in output order. Types are the keys of FIELD_TYPES.
+
+    Example:
+        layout = RecordLayout([('ID', 0, 6, 'int'), ('Name', 6, 15)])
+        layout.decode("0001  John           ")  # (1, 'John')
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(Field(*field) for field in fields)
+        for field in self.fields:
+            if field.type not in FIELD_TYPES:
+                raise ValueError(f"Unknown type {field.type!r} for field {field.name!r}")
+
+        self.names = tuple(field.name for field in self.fields)
+        self.record_length = max(field.offset + field.width for field in self.fields)
+
+        slices = [slice(field.offset, field.offset + field.width) for field in self.fields]
+        if len(slices) == 1:
+            self._slicer = lambda line, only=slices[0]: (line[only],)
+        else:
+            self._slicer = itemgetter(*slices)
+        self._converters = tuple(FIELD_TYPES[field.type] for field in self.fields)
+
+    def __reduce__(self):
+        # Rebuild from the spec so layouts can be sent to worker processes
+        return (RecordLayout, (self.fields,))
+
+    def __repr__(self):
+        return f"RecordLayout({list(self.fields)!r})"
+
+    def split(self, line):
+        """
+        Cuts a record into its stripped string fields.
+
+        Args:
+            line (str): One fixed-length record.
+
+        Returns:
+            list: The stripped text of each field.
+        """
+        return list(map(str.strip, self._slicer(line)))
+
+    def decode(self, line):
+        """
+        Cuts a record into fields and converts each one to its typed value.
+
+        Args:
+            line (str): One fixed-length record.
+
+        Returns:
+            tuple: The typed value of each field, None where a field is blank.
+        """
+        return tuple(convert(value) if value else None
+                     for convert, value in zip(self._converters, self.split(line)))
+
+
+# Layout of the student data extract
+STUDENT_LAYOUT = RecordLayout([
+    ('ID', 0, 6, 'int'),
+    ('FirstName', 6, 15),
+    ('LastName', 21, 15),
+    ('Grade', 36, 6, 'int'),
+    ('GPA', 42, 4, 'float'),
+    ('BirthDate', 48, 10, 'date'),
+    ('Gender', 60, 6),
+    ('ClassRank', 67, 9, 'int'),
+    ('AttendPct', 76, 10, 'float'),
+    ('Honors', 86, 7, 'bool'),
+    ('Sports', 93, 9),
+    ('ClubCount', 102, 10, 'int'),
+])
+
+# File paths
+input_path = r"C:\Users\bjones25\Downloads\student_data_cs2.txt"
+output_path = r"C:\Users\bjones25\Downloads\fixed_length_conversion_bobby_jones.csv"
+
+# Size of the piece of the input each worker converts in parallel mode
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def fixed_length_to_csv(input_file, output_file, workers=None, chunk_size=CHUNK_SIZE,
+                        layout=STUDENT_LAYOUT):
+    """
+    Reads a fixed-length formatted text file, extracts fields using slicing,
+    and writes the formatted data to a CSV file.
+
+    Args:
+        input_file (str): Path to the input fixed-length text file.
+        output_file (str): Path to the output CSV file.
+        workers (int): Number of worker processes. None or 1 converts the
+            file serially; anything larger memory-maps the input and converts
+            it in chunks across a process pool.
+        chunk_size (int): Approximate number of bytes per parallel chunk.
+        layout (RecordLayout): Column layout of the input records.
+
+    """
+    if workers is not None and workers > 1:
+        _fixed_length_to_csv_parallel(input_file, output_file, workers, chunk_size, layout)
+        return
+
+    # Read the fixed-length text file
+    with open(input_file, 'r') as infile, open(output_file, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+
+        # Write header
+
+        # Process each line in the file
+        for line in infile:
+            writer.writerow(layout.split(line))
+
+
+def fixed_length_to_csv_incremental(input_file, output_file, checkpoint_file=None,
+                                    chunk_size=CHUNK_SIZE, layout=STUDENT_LAYOUT):
+    """
+    Converts only the records appended to a fixed-length file since the last run.
+
+    A JSON checkpoint records how far into the input and output the previous
+    run got, plus a SHA-256 of the processed input prefix. If the prefix still
+    matches, only the new complete records are converted and appended; if the
+    input was rewritten the CSV is rebuilt from scratch. The checkpoint is
+    advanced after every chunk, so a run that crashes part way resumes from the
+    last finished chunk. A trailing record without a newline is left for the
+    next run, since upstream may still be writing it.
+
+    Args:
+        input_file (str): Path to the input fixed-length text file.
+        output_file (str): Path to the output CSV file.
+        checkpoint_file (str): Path of the checkpoint file; defaults to
+            output_file with '.checkpoint' appended.
+        chunk_size (int): Approximate number of bytes converted per checkpoint.
+        layout (RecordLayout): Column layout of the input records.
+
+    Returns:
+        int: Number of input bytes converted by this run.
+
+    Example:
+        fixed_length_to_csv_incremental('student_data_cs2.txt', 'students.csv')
+    """
+    if checkpoint_file is None:
+        checkpoint_file = output_file + '.checkpoint'
+
+    checkpoint = _load_checkpoint(checkpoint_file)
+    digest, input_offset, output_offset = _resume_point(input_file, output_file, checkpoint)
+    if not input_offset:
+        # Starting over, so the old CSV and checkpoint must go even if there is nothing to convert yet
+        open(output_file, 'w').close()
+        _save_checkpoint(checkpoint_file, {
+            'input_offset': 0,
+            'output_offset': 0,
+            'checksum': digest.hexdigest(),
+        })
+
+    size = os.path.getsize(input_file)
+    if size <= input_offset:
+        return 0
+    with open(input_file, 'rb') as infile, \
+            mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        complete = data.rfind(b'\n', input_offset) + 1
+    if complete <= input_offset:
+        return 0
+
+    start_offset = input_offset
+    with open(output_file, 'r+' if input_offset else 'w', newline='') as csvfile:
+        # Drop anything written after the last checkpoint by a crashed run
+        csvfile.seek(output_offset)
+        csvfile.truncate()
+
+        for start, end in chunk_ranges(input_file, chunk_size, input_offset):
+            end = min(end, complete)
+            if start >= end:
+                break
+            csvfile.write(convert_range(input_file, start, end, layout))
+            csvfile.flush()
+            os.fsync(csvfile.fileno())
+
+            with open(input_file, 'rb') as infile:
+                infile.seek(start)
+                _hash_stream(digest, infile, end - start)
+            input_offset = end
+            output_offset = os.fstat(csvfile.fileno()).st_size
+            _save_checkpoint(checkpoint_file, {
+                'input_offset': input_offset,
+                'output_offset': output_offset,
+                'checksum': digest.hexdigest(),
+            })
+
+    return input_offset - start_offset
+
+
+def _load_checkpoint(checkpoint_file):
+    """
+    Reads a checkpoint written by fixed_length_to_csv_incremental.
+
+    Args:
+        checkpoint_file (str): Path of the checkpoint file.
+
+    Returns:
+        dict: The checkpoint, or None if it is missing or unreadable.
+    """
+    try:
+        with open(checkpoint_file, 'r') as infile:
+            return json.load(infile)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_checkpoint(checkpoint_file, checkpoint):
+    """
+    Atomically replaces the checkpoint file so a crash never leaves half of one.
+
+    Args:
+        checkpoint_file (str): Path of the checkpoint file.
+        checkpoint (dict): Offsets and checksum to record.
+    """
+    temp_file = checkpoint_file + '.tmp'
+    with open(temp_file, 'w') as outfile:
+        json.dump(checkpoint, outfile)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    os.replace(temp_file, checkpoint_file)
+
+
+def _resume_point(input_file, output_file, checkpoint):
+    """
+    Works out where an incremental run can pick up from.
+
+    Args:
+        input_file (str): Path to the input fixed-length text file.
+        output_file (str): Path to the output CSV file.
+        checkpoint (dict): The previous checkpoint, or None.
+
+    Returns:
+        tuple: (running SHA-256 of the input prefix, input offset, output offset).
+        The offsets are 0 when the previous output cannot be reused.
+    """
+    digest = hashlib.sha256()
+    if not checkpoint:
+        return digest, 0, 0
+
+    input_offset = checkpoint['input_offset']
+    output_offset = checkpoint['output_offset']
+    if (not os.path.exists(output_file)
+            or os.path.getsize(output_file) < output_offset
+            or os.path.getsize(input_file) < input_offset):
+        return hashlib.sha256(), 0, 0
+
+    with open(input_file, 'rb') as infile:
+        _hash_stream(digest, infile, input_offset)
+    if digest.hexdigest() != checkpoint['checksum']:
+        # The already converted records changed, so start over
+        return hashlib.sha256(), 0, 0
+    return digest, input_offset, output_offset
+
+
+def _hash_stream(digest, infile, length, block_size=1024 * 1024):
+    """
+    Feeds the next length bytes of a binary file into a running hash.
+
+    Args:
+        digest: A hashlib object to update.
+        infile: Binary file positioned at the first byte to hash.
+        length (int): Number of bytes to hash.
+        block_size (int): Number of bytes read at a time.
+    """
+    while length > 0:
+        block = infile.read(min(block_size, length))
+        if not block:
+            break
+        digest.update(block)
+        length -= len(block)
+
+
+def iter_records(input_file, layout=STUDENT_LAYOUT, skip_header=True):
+    """
+    Reads a fixed-length formatted text file and yields each record as typed values.
+
+    Args:
+        input_file (str): Path to the input fixed-length text file.
+        layout (RecordLayout): Column layout of the input records.
+        skip_header (bool): Whether the first line is a header row to skip.
+
+    Returns:
+        generator: One tuple of typed values per record, in layout order.
+
+    Example:
+        for student_id, first, last, *rest in iter_records('student_data_cs2.txt'):
+            print(student_id, first, last)
+    """
+    with open(input_file, 'r') as infile:
+        if skip_header:
+            next(infile, None)
+        for line in infile:
+            if line.strip():
+                yield layout.decode(line)
+
+
+def chunk_ranges(input_file, chunk_size=CHUNK_SIZE, start=0):
+    """
+    Splits a file into byte ranges that start and end on record boundaries.
+
+    Args:
+        input_file (str): Path to the input fixed-length text file.
+        chunk_size (int): Approximate number of bytes per range.
+        start (int): Offset of the record to start from.
+
+    Returns:
+        list: (start, end) byte offsets covering the rest of the file in order.
+
+    Raises:
+        ValueError: If chunk_size is less than 1.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    size = os.path.getsize(input_file)
+    if size <= start:
+        return []
+
+    ranges = []
+    with open(input_file, 'rb') as infile, \
+            mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        while start < size:
+            # Extend each chunk to the end of the record it lands in
+            newline = data.find(b'\n', min(start + chunk_size, size) - 1)
+            end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def convert_range(input_file, start, end, layout=STUDENT_LAYOUT):
+    """
+    Converts one byte range of a fixed-length file to CSV text.
+
+    The range is decoded and split into lines exactly the way the serial path
+    reads the file, so the returned text matches it byte for byte.
+
+    Args:
+        input_file (str): Path to the input fixed-length text file.
+        start (int): Offset of the first byte of the range.
+        end (int): Offset one past the last byte of the range.
+        layout (RecordLayout): Column layout of the input records.
+
+    Returns:
+        str: The CSV rows for every record in the range.
+    """
+    with open(input_file, 'rb') as infile, \
+            mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        lines = io.TextIOWrapper(io.BytesIO(data[start:end]))
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    for line in lines:
+        writer.writerow(layout.split(line))
+    return output.getvalue()
+
+
+def _fixed_length_to_csv_parallel(input_file, output_file, workers, chunk_size, layout):
+    """
+    Converts the file in chunks on a process pool, writing them back in order.
+
+    Only a couple of chunks per worker are in flight at once so memory stays
+    bounded no matter how large the input is.
+
+    Args:
+        input_file (str): Path to the input fixed-length text file.
+        output_file (str): Path to the output CSV file.
+        workers (int): Number of worker processes.
+        chunk_size (int): Approximate number of bytes per chunk.
+        layout (RecordLayout): Column layout of the input records.
+    """
+    ranges = iter(chunk_ranges(input_file, chunk_size))
+    pending = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            open(output_file, 'w', newline='') as csvfile:
+        for start, end in ranges:
+            pending.append(pool.submit(convert_range, input_file, start, end, layout))
+            if len(pending) >= 2 * workers:
+                csvfile.write(pending.popleft().result())
+        while pending:
+            csvfile.write(pending.popleft().result())
+
+
+# NumPy dtype for each field type; str fields become fixed-width unicode
+NUMPY_TYPES = {
+    'int': 'i8',
+    'float': 'f8',
+    'date': 'datetime64[D]',
+    'bool': '?',
+}
+
+# Value stored for a blank int field, since int arrays have no NaN
+MISSING_INT = -1
+
+# Records copied into the character grid at a time, which bounds the size of the index arrays
+GRID_BLOCK = 16384
+
+
+def numpy_dtype(layout=STUDENT_LAYOUT):
+    """
+    Builds the NumPy structured dtype matching a record layout.
+
+    Args:
+        layout (RecordLayout): Column layout of the input records.
+
+    Returns:
+        numpy.dtype: One named field per layout column.
+    """
+    import numpy as np
+
+    return np.dtype([(field.name, NUMPY_TYPES.get(field.type, f'U{field.width}'))
+                     for field in layout.fields])
+
+
+def fixed_length_to_columns(input_file, layout=STUDENT_LAYOUT, skip_header=True):
+    """
+    Reads a fixed-length formatted text file straight into typed NumPy columns.
+
+    The file is read as raw bytes and copied into a (records x record length)
+    grid of uint8, one byte per character, so each column is cut out with a
+    single slice of the grid and converted in bulk, with no Python work per
+    record and no CSV file in between. Peak memory is about twice the file
+    size. Lines that are blank up to the record length are skipped. Blank
+    fields become NaN (float), NaT (date), False (bool), MISSING_INT (int) or
+    '' (str). Field offsets count bytes, so text fields are expected to be
+    ASCII; other bytes in a str field are decoded as UTF-8.
+
+    Args:
+        input_file (str): Path to the input fixed-length text file.
+        layout (RecordLayout): Column layout of the input records.
+        skip_header (bool): Whether the first line is a header row to skip.
+
+    Returns:
+        dict: Field name to a 1D NumPy array of that field's values.
+
+    Example:
+        columns = fixed_length_to_columns('student_data_cs2.txt')
+        columns['GPA'].mean()
+    """
+    import numpy as np
+
+    data = np.fromfile(input_file, dtype=np.uint8)
+    ends = np.flatnonzero(data == ord('\n'))
+    starts = np.concatenate(([0], ends + 1))
+    ends = np.append(ends, len(data))
+    lengths = ends - starts
+    if len(data):
+        # Drop the carriage return of Windows line endings, as text mode would
+        lengths -= (lengths > 0) & (data[ends - 1] == ord('\r'))
+    if skip_header:
+        starts, lengths = starts[1:], lengths[1:]
+
+    # Short lines are padded with spaces and long ones cut to the record length, like slicing would
+    width = layout.record_length
+    lengths = np.minimum(lengths, width)
+    grid = np.full((len(starts), width), ord(' '), dtype=np.uint8)
+    positions = np.arange(width)
+    for first in range(0, len(starts), GRID_BLOCK):
+        block = slice(first, first + GRID_BLOCK)
+        inside = positions < lengths[block, None]
+        grid[block][inside] = data[(starts[block, None] + positions)[inside]]
+    del data
+    grid = grid[(grid > ord(' ')).any(axis=1)]
+
+    dtype = numpy_dtype(layout)
+    columns = {}
+    for field in layout.fields:
+        cells = np.ascontiguousarray(grid[:, field.offset:field.offset + field.width])
+        text = np.char.strip(cells.view(f'S{field.width}').reshape(len(grid)))
+        blank = text == b''
+        if field.type == 'bool':
+            values = np.isin(np.char.upper(text), [b'Y', b'YES', b'T', b'TRUE', b'1'])
+        elif field.type == 'str':
+            if (cells < 0x80).all():
+                values = text.astype(dtype[field.name])
+            else:
+                values = np.char.decode(text, 'utf-8', 'replace').astype(dtype[field.name])
+        else:
+            fill = {'int': str(MISSING_INT), 'float': 'nan', 'date': 'NaT'}[field.type].encode('ascii')
+            values = np.where(blank, fill, text).astype(dtype[field.name])
+        columns[field.name] = values
+    return columns
+
+
+def fixed_length_to_array(input_file, layout=STUDENT_LAYOUT, skip_header=True):
+    """
+    Reads a fixed-length formatted text file into a NumPy structured array.
+
+    Args:
+        input_file (str): Path to the input fixed-length text file.
+        layout (RecordLayout): Column layout of the input records.
+        skip_header (bool): Whether the first line is a header row to skip.
+
+    Returns:
+        numpy.ndarray: One record per line, with a named field per column.
+    """
+    import numpy as np
+
+    columns = fixed_length_to_columns(input_file, layout, skip_header)
+    records = np.empty(len(next(iter(columns.values()))), dtype=numpy_dtype(layout))
+    for name, values in columns.items():
+        records[name] = values
+    return records
+
+
+def save_records(records, path):
+    """
+    Saves a structured record array as a .npy file.
+
+    Args:
+        records (numpy.ndarray): Array returned by fixed_length_to_array.
+        path (str): Path of the .npy file to write.
+    """
+    import numpy as np
+
+    np.save(path, records, allow_pickle=False)
+
+
+def load_records(path, mmap=True):
+    """
+    Loads a structured record array saved by save_records.
+
+    Args:
+        path (str): Path of the .npy file to read.
+        mmap (bool): Memory-map the file read-only instead of reading it in,
+            so even very large files open instantly without a copy.
+
+    Returns:
+        numpy.ndarray: The saved records.
+    """
+    import numpy as np
+
+    return np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+
+
+def save_columns(columns, path, compress=False):
+    """
+    Saves a dict of column arrays as a .npz archive.
+
+    Args:
+        columns (dict): Field name to column array, as from fixed_length_to_columns.
+        path (str): Path of the .npz file to write.
+        compress (bool): Whether to zip-compress the archive.
+    """
+    import numpy as np
+
+    (np.savez_compressed if compress else np.savez)(path, **columns)
+
+
+def load_columns(path):
+    """
+    Loads a dict of column arrays saved by save_columns.
+
+    Every column is read into memory before the archive is closed; use
+    save_records and load_records when the data needs to be memory-mapped.
+
+    Args:
+        path (str): Path of the .npz file to read.
+
+    Returns:
+        dict: Field name to column array.
+    """
+    import numpy as np
+
+    with np.load(path, allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def grade_aggregates(records):
+    """
+    Computes per-grade student counts, average GPA and attendance, and best class rank.
+
+    Students with a blank grade are left out, and blank GPAs, attendance and
+    class ranks (NaN or MISSING_INT) are left out of the figures they feed.
+
+    Args:
+        records (numpy.ndarray or dict): Structured records or a dict of columns.
+
+    Returns:
+        dict: 'Grade', 'Count', 'MeanGPA', 'MeanAttendPct' and 'TopRank' arrays,
+        one entry per grade in ascending order. A mean is NaN and a rank
+        MISSING_INT when no student in the grade has a value for it.
+    """
+    import numpy as np
+
+    known = records['Grade'] != MISSING_INT
+    grades, group = np.unique(records['Grade'][known], return_inverse=True)
+    counts = np.bincount(group, minlength=len(grades))
+
+    def mean(values):
+        values = values[known]
+        present = ~np.isnan(values)
+        totals = np.bincount(group[present], weights=values[present], minlength=len(grades))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return totals / np.bincount(group[present], minlength=len(grades))
+
+    ranks = records['ClassRank'][known]
+    ranked = ranks != MISSING_INT
+    top_rank = np.full(len(grades), np.iinfo(np.int64).max)
+    np.minimum.at(top_rank, group[ranked], ranks[ranked])
+    top_rank[top_rank == np.iinfo(np.int64).max] = MISSING_INT
+
+    return {
+        'Grade': grades,
+        'Count': counts,
+        'MeanGPA': mean(records['GPA']),
+        'MeanAttendPct': mean(records['AttendPct']),
+        'TopRank': top_rank,
+    }
+
+
+def expand_paths(patterns):
+    """
+    Expands any glob patterns in a list of paths, keeping the given order.
+
+    Args:
+        patterns (list): File paths and/or glob patterns such as 'feeds/*.txt'.
+
+    Returns:
+        list: Matching file paths; plain paths are passed through unchanged.
+    """
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def main(argv=None):
+    """
+    Converts every fixed-length file named on the command line to a CSV file.
+
+    With no input files it converts the default student extract. Each input
+    is written as <name>.csv next to it, or into --output-dir if given.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 if every file converted, 1 if any failed.
+    """
+    parser = argparse.ArgumentParser(description="Convert fixed-length text files to CSV.")
+    parser.add_argument('inputs', nargs='*', help="input files or glob patterns")
+    parser.add_argument('-o', '--output-dir', help="directory for the CSV files")
+    parser.add_argument('-w', '--workers', type=int, help="worker processes per file")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only convert records appended since the last run")
+    args = parser.parse_args(argv)
+
+    if args.inputs:
+        jobs = []
+        for input_file in expand_paths(args.inputs):
+            stem = os.path.splitext(os.path.basename(input_file))[0]
+            output_dir = args.output_dir or os.path.dirname(input_file)
+            jobs.append((input_file, os.path.join(output_dir, stem + '.csv')))
+    else:
+        jobs = [(input_path, output_path)]
+
+    status = 0
+    for input_file, output_file in jobs:
+        try:
+            if args.incremental:
+                fixed_length_to_csv_incremental(input_file, output_file)
+            else:
+                fixed_length_to_csv(input_file, output_file, workers=args.workers)
+        except (OSError, ValueError) as error:
+            print(f"Failed to convert {input_file}: {error}", file=sys.stderr)
+            status = 1
+            continue
+        print(f"CSV file successfully created: {output_file}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
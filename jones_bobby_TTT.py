@@ -5,11 +5,59 @@ Description: This program allows a user to play tic tac toe, either against the
 Version Log: 1.0
 Bugs: None
 Features: None
-Sources: https://www.geeksforgeeks.org/python-using-2d-arrays-lists-the-right-way/, https://www.w3schools.com/python/python_try_except.asp
+Sources: https://www.geeksforgeeks.org/python-using-2d-arrays-lists-the-right-way/, https://www.w3schools.com/python/python_try_except.asp,
+         https://en.wikipedia.org/wiki/Negamax, https://en.wikipedia.org/wiki/Transposition_table,
+         https://www.chessprogramming.org/Bitboards
 
 '''
 
+import argparse
 import random
+import time
+
+# The 8 rotations and reflections of the board, each as the index of the square that lands in positions 0-8
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),  # Identity
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),  # Rotate 90
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),  # Rotate 180
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),  # Rotate 270
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),  # Mirror left-right
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),  # Mirror top-bottom
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),  # Mirror main diagonal
+    (8, 5, 2, 7, 4, 1, 6, 3, 0)   # Mirror other diagonal
+]
+
+# A bitboard keeps one player's marks in a 9-bit integer, with square i in bit i
+FULL_BOARD = 0b111111111
+
+# Bitboard of each win condition: rows, columns, then diagonals
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+)
+
+# WINNING[bits] is 1 if a bitboard holds a complete win condition, for all 512 bitboards
+WINNING = bytes(any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL_BOARD + 1))
+
+# Number of marks on each bitboard
+MARK_COUNT = bytes(bin(bits).count('1') for bits in range(FULL_BOARD + 1))
+
+# SYMMETRY_TABLES[s][bits] is a bitboard after applying SYMMETRIES[s] to it
+SYMMETRY_TABLES = [[sum(1 << target for target, source in enumerate(symmetry) if bits >> source & 1)
+                    for bits in range(FULL_BOARD + 1)] for symmetry in SYMMETRIES]
+
+# Squares tried first to last, with their bits; the center and corners usually cut the search off soonest
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+MOVE_BITS = tuple((move, 1 << move) for move in MOVE_ORDER)
+
+# Kinds of transposition table entries: the exact value, or only a lower or upper bound on it
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Search results shared by every game: canonical position to (value, kind), and board to best move
+transpositions = {}
+best_moves = {}
+search_stats = {'nodes': 0}
 
 
 def display_board(board):
@@ -24,6 +72,71 @@ def display_board(board):
     print("\n")
 
 
+def board_bits(board, mark):
+    """
+    Packs one player's marks on a list board into a bitboard.
+
+    Args:
+        board (list): The 1D Tic Tac Toe board.
+        mark (str): The player's mark ('X' or 'O').
+
+    Returns:
+        int: The bitboard, with bit i set if square i holds the mark.
+    """
+    bits = 0
+    for i, cell in enumerate(board):
+        if cell == mark:
+            bits |= 1 << i
+    return bits
+
+
+def to_bitboard(board):
+    """
+    Converts a list board to a pair of bitboards.
+
+    Args:
+        board (list): The 1D Tic Tac Toe board.
+
+    Returns:
+        tuple: (X bitboard, O bitboard).
+    """
+    return board_bits(board, 'X'), board_bits(board, 'O')
+
+
+def from_bitboard(x_bits, o_bits):
+    """
+    Converts a pair of bitboards back to a list board, e.g. for display_board.
+
+    Args:
+        x_bits (int): X's bitboard.
+        o_bits (int): O's bitboard.
+
+    Returns:
+        list: The 1D Tic Tac Toe board.
+    """
+    return ['X' if x_bits >> i & 1 else 'O' if o_bits >> i & 1 else ' ' for i in range(9)]
+
+
+def legal_moves(x_bits, o_bits):
+    """
+    Lists the empty squares of a bitboard position.
+
+    Args:
+        x_bits (int): X's bitboard.
+        o_bits (int): O's bitboard.
+
+    Returns:
+        list: The empty square indexes (0-8), lowest first.
+    """
+    free = FULL_BOARD & ~(x_bits | o_bits)
+    moves = []
+    while free:
+        lowest = free & -free
+        moves.append(lowest.bit_length() - 1)
+        free ^= lowest
+    return moves
+
+
 def check_winner(board, mark):
     """
     Checks if the specified mark (X or O) has won.
@@ -35,17 +148,7 @@ def check_winner(board, mark):
     Returns:
         bool: True if the player with the mark has won, False otherwise.
     """
-    win_conditions = [
-        [0, 1, 2],  # Top row
-        [3, 4, 5],  # Middle row
-        [6, 7, 8],  # Bottom row
-        [0, 3, 6],  # Left column
-        [1, 4, 7],  # Middle column
-        [2, 5, 8],  # Right column
-        [0, 4, 8],  # Diagonal top-left to bottom-right
-        [2, 4, 6]   # Diagonal top-right to bottom-left
-    ]
-    return any(all(board[pos] == mark for pos in condition) for condition in win_conditions)
+    return WINNING[board_bits(board, mark)] == 1
 
 
 def get_player_choice(board, player):
@@ -84,6 +187,166 @@ def get_computer_move(board):
     return random.choice(empty_positions)
 
 
+def canonical_key(mine, theirs):
+    """
+    Builds the transposition table key of a position, the same for all 8 symmetries of it.
+
+    Args:
+        mine (int): Bitboard of the player to move.
+        theirs (int): Bitboard of the other player.
+
+    Returns:
+        int: The smallest of the 8 rotated and reflected positions, packed as
+        the mover's bitboard above the other player's.
+    """
+    return min(table[mine] << 9 | table[theirs] for table in SYMMETRY_TABLES)
+
+
+def negamax(mine, theirs, alpha, beta):
+    """
+    Scores a position for the player to move with minimax and alpha-beta pruning.
+
+    A win scores 1 plus the number of empty squares left after the winning
+    move, so quicker wins score higher; a draw scores 0 and a loss is
+    negative. Results are stored in the transposition table, so each
+    position (up to symmetry) is searched once.
+
+    Args:
+        mine (int): Bitboard of the player to move.
+        theirs (int): Bitboard of the other player.
+        alpha (int): The score the player to move is already sure of.
+        beta (int): The score the opponent will not allow beyond.
+
+    Returns:
+        int: The score, exact if it is strictly between alpha and beta, otherwise a bound.
+    """
+    search_stats['nodes'] += 1
+    key = canonical_key(mine, theirs)
+    entry = transpositions.get(key)
+    if entry is not None:
+        value, kind = entry
+        if kind == EXACT:
+            return value
+        if kind == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    taken = mine | theirs
+    empty = 9 - MARK_COUNT[taken]
+    original_alpha = alpha
+    best = -10
+    for move, bit in MOVE_BITS:
+        if taken & bit:
+            continue
+        placed = mine | bit
+        if WINNING[placed]:
+            value = empty
+        elif empty == 1:
+            value = 0
+        else:
+            value = -negamax(theirs, placed, -beta, -alpha)
+        if value > best:
+            best = value
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+    if best <= original_alpha:
+        transpositions[key] = (best, UPPER)
+    elif best >= beta:
+        transpositions[key] = (best, LOWER)
+    else:
+        transpositions[key] = (best, EXACT)
+    return best
+
+
+def get_best_move(board, mark):
+    """
+    Returns a perfect-play move for the computer.
+
+    Every position met is kept in the transposition table and every answer in
+    best_moves, so after the first few games a move is a dictionary lookup.
+
+    Args:
+        board (list): The Tic Tac Toe board.
+        mark (str): The computer's mark ('X' or 'O').
+
+    Returns:
+        int: The index for the move (0-8).
+    """
+    key = ("".join(board), mark)
+    move = best_moves.get(key)
+    if move is not None:
+        return move
+
+    mine = board_bits(board, mark)
+    theirs = board_bits(board, 'O' if mark == 'X' else 'X')
+    taken = mine | theirs
+    empty = 9 - MARK_COUNT[taken]
+    best = -10
+    for square, bit in MOVE_BITS:
+        if taken & bit:
+            continue
+        placed = mine | bit
+        if WINNING[placed]:
+            value = empty
+        elif empty == 1:
+            value = 0
+        else:
+            value = -negamax(theirs, placed, -10, -best)
+        if value > best:
+            best, move = value, square
+    best_moves[key] = move
+    return move
+
+
+def benchmark_engine(positions=10000, seed=0):
+    """
+    Measures how fast the perfect-play engine searches and answers.
+
+    Args:
+        positions (int): Number of random positions to ask for a move after warm-up.
+        seed (int): Seed for picking the positions.
+
+    Returns:
+        dict: Nodes searched and time taken to solve the game from an empty
+        board, and moves per second once the tables are warm.
+    """
+    transpositions.clear()
+    best_moves.clear()
+    search_stats['nodes'] = 0
+    start = time.perf_counter()
+    get_best_move([' '] * 9, 'X')
+    solve_time = time.perf_counter() - start
+    nodes = search_stats['nodes']
+    entries = len(transpositions)
+
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < positions:
+        board = [' '] * 9
+        mark = 'X'
+        for _ in range(rng.randrange(9)):
+            board[rng.choice([i for i, cell in enumerate(board) if cell == ' '])] = mark
+            if check_winner(board, mark):
+                break
+            mark = 'O' if mark == 'X' else 'X'
+        else:
+            boards.append((board, mark))
+    for board, mark in boards:
+        get_best_move(board, mark)
+
+    start = time.perf_counter()
+    for board, mark in boards:
+        get_best_move(board, mark)
+    move_time = time.perf_counter() - start
+    return {'solve_nodes': nodes, 'solve_seconds': solve_time, 'table_entries': entries,
+            'moves_per_second': positions / move_time, 'microseconds_per_move': move_time / positions * 1e6}
+
+
 def get_valid_num_players():
     """
     Prompts the user to enter the number of players and validates the input.
@@ -116,15 +379,34 @@ def get_valid_player_mark():
         print("Invalid input! Please choose 'X' or 'O'.")
 
 
-def play_game():
+def get_valid_difficulty():
+    """
+    Prompts the user to choose how well the computer plays and validates the input.
+
+    Returns:
+        str: 'easy' for random moves, 'hard' for perfect play.
+    """
+    while True:
+        difficulty = input("Choose a difficulty (easy or hard): ").lower()
+        if difficulty in ['easy', 'hard']:
+            return difficulty
+        print("Invalid input! Please choose 'easy' or 'hard'.")
+
+
+def play_game(difficulty=None):
     """
     Plays a single game of Tic Tac Toe.
+
+    Args:
+        difficulty (str): 'easy' or 'hard' for the computer; asked for if not given.
     """
     # Initialize the board
     board = [' ' for _ in range(9)]
 
     # Choose players
     num_players = get_valid_num_players()
+    if num_players == 1 and difficulty is None:
+        difficulty = get_valid_difficulty()
     player1_mark = get_valid_player_mark()
     player2_mark = 'O' if player1_mark == 'X' else 'X'
 
@@ -141,7 +423,7 @@ def play_game():
             move = get_player_choice(board, current_player)
         else:  # Computer's turn
             print("Computer is making a move...")
-            move = get_computer_move(board)
+            move = get_best_move(board, current_mark) if difficulty == 'hard' else get_computer_move(board)
 
         # Place the mark and check for a win
         board[move] = current_mark
@@ -156,13 +438,26 @@ def play_game():
     return False
 
 
-def main():
+def main(argv=None):
     """
     Main function to run the Tic Tac Toe game.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
     """
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe.")
+    parser.add_argument('--difficulty', choices=['easy', 'hard'], help="how well the computer plays")
+    parser.add_argument('--benchmark', action='store_true', help="time the perfect-play engine and exit")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        for name, value in benchmark_engine().items():
+            print(f"{name}: {value:,.2f}" if isinstance(value, float) else f"{name}: {value:,}")
+        return
+
     print("Welcome to Tic Tac Toe!")
     while True:
-        play_game()
+        play_game(args.difficulty)
         play_again = input("Do you want to play again? (yes/no): ").lower()
         if play_again != 'yes':
             print("Thanks for playing! Goodbye!")
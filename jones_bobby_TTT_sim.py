@@ -0,0 +1,305 @@
+'''
+Author: Bobby Jones
+Date: 10/18/26
+Description: Plays Tic Tac Toe move policies against each other without a screen or keyboard, as many games as
+             asked for, spread over a pool of worker processes. Reports win, draw and loss rates, games per
+             second and how long each policy takes per move. Every run is repeatable from its seed.
+Bugs: None
+Sources: https://docs.python.org/3/library/concurrent.futures.html, https://docs.python.org/3/library/random.html
+'''
+
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import os
+import random
+import sys
+import time
+
+from jones_bobby_TTT import check_winner, get_best_move
+from jones_bobby_TTT_solver import SolvedTable
+
+# Games played per task sent to a worker
+BATCH_SIZE = 2000
+
+# Most move times kept from each batch for the percentiles
+TIME_SAMPLE = 2000
+
+# Solved table, opened the first time a process uses solved_policy
+_solved = {}
+
+# Totals from a batch of games, counted from player 1's side
+BatchResult = namedtuple('BatchResult', ['wins', 'draws', 'losses', 'seconds', 'times1', 'times2'])
+
+
+def random_policy(board, mark, rng):
+    """
+    Picks a random empty square, like get_computer_move but with its own random generator.
+
+    Args:
+        board (list): The 1D Tic Tac Toe board.
+        mark (str): The mover's mark.
+        rng (random.Random): Source of randomness.
+
+    Returns:
+        int: The index for the move (0-8).
+    """
+    return rng.choice([i for i, cell in enumerate(board) if cell == ' '])
+
+
+def minimax_policy(board, mark, rng):
+    """
+    Plays perfectly with get_best_move.
+
+    Args:
+        board (list): The 1D Tic Tac Toe board.
+        mark (str): The mover's mark.
+        rng (random.Random): Unused; perfect play is deterministic.
+
+    Returns:
+        int: The index for the move (0-8).
+    """
+    return get_best_move(board, mark)
+
+
+def solved_policy(board, mark, rng):
+    """
+    Plays perfectly from the solved table, picking at random among equally good moves.
+
+    Args:
+        board (list): The 1D Tic Tac Toe board.
+        mark (str): The mover's mark.
+        rng (random.Random): Breaks ties between equally good moves.
+
+    Returns:
+        int: The index for the move (0-8).
+    """
+    if 'table' not in _solved:
+        _solved['table'] = SolvedTable.open()
+    return rng.choice(_solved['table'].best_moves(board))
+
+
+def heuristic_policy(board, mark, rng):
+    """
+    Wins if it can, blocks if it must, otherwise takes the center, then a corner, then an edge.
+
+    Args:
+        board (list): The 1D Tic Tac Toe board.
+        mark (str): The mover's mark.
+        rng (random.Random): Breaks ties between equally good squares.
+
+    Returns:
+        int: The index for the move (0-8).
+    """
+    empty = [i for i, cell in enumerate(board) if cell == ' ']
+    other = 'O' if mark == 'X' else 'X'
+    for player in (mark, other):
+        for square in empty:
+            board[square] = player
+            won = check_winner(board, player)
+            board[square] = ' '
+            if won:
+                return square
+    if board[4] == ' ':
+        return 4
+    corners = [square for square in (0, 2, 6, 8) if board[square] == ' ']
+    return rng.choice(corners or empty)
+
+
+# Policies by name, so they can be chosen on the command line and sent to workers
+POLICIES = {
+    'random': random_policy,
+    'minimax': minimax_policy,
+    'solved': solved_policy,
+    'heuristic': heuristic_policy,
+}
+
+
+def play_headless(policy_x, policy_o, rng, times_x=None, times_o=None):
+    """
+    Plays one game between two policies without printing anything.
+
+    Args:
+        policy_x (function): Chooses X's moves; called as policy(board, mark, rng).
+        policy_o (function): Chooses O's moves.
+        rng (random.Random): Passed to the policies.
+        times_x (list): If given, each of X's move times in seconds is appended to it.
+        times_o (list): The same for O.
+
+    Returns:
+        str: 'X' or 'O' for the winner, or None for a tie.
+    """
+    board = [' '] * 9
+    players = ((policy_x, 'X', times_x), (policy_o, 'O', times_o))
+    for turn in range(9):
+        policy, mark, times = players[turn % 2]
+        start = time.perf_counter()
+        move = policy(board, mark, rng)
+        if times is not None:
+            times.append(time.perf_counter() - start)
+        if board[move] != ' ':
+            raise ValueError(f"Policy for {mark} played on taken square {move}")
+        board[move] = mark
+        if turn >= 4 and check_winner(board, mark):
+            return mark
+    return None
+
+
+def play_batch(player1, player2, first_game, games, seed):
+    """
+    Plays a batch of games, alternating which player goes first.
+
+    Game g uses its own random generator seeded from (seed, g), so results do
+    not depend on how games are split into batches or workers.
+
+    Args:
+        player1 (str): Name of player 1's policy in POLICIES.
+        player2 (str): Name of player 2's policy.
+        first_game (int): Number of the first game in the batch.
+        games (int): Number of games to play.
+        seed (int): Seed for the whole run.
+
+    Returns:
+        BatchResult: Player 1's wins, draws and losses, time taken, and a
+        sample of each player's move times.
+    """
+    policy1, policy2 = POLICIES[player1], POLICIES[player2]
+    wins = draws = losses = 0
+    times1, times2 = [], []
+    start = time.perf_counter()
+    for game in range(first_game, first_game + games):
+        rng = random.Random(seed * 1000003 + game)
+        if game % 2 == 0:
+            winner = play_headless(policy1, policy2, rng, times1, times2)
+            mark1 = 'X'
+        else:
+            winner = play_headless(policy2, policy1, rng, times2, times1)
+            mark1 = 'O'
+        if winner is None:
+            draws += 1
+        elif winner == mark1:
+            wins += 1
+        else:
+            losses += 1
+    seconds = time.perf_counter() - start
+
+    sampler = random.Random(seed * 1000003 - first_game)
+    if len(times1) > TIME_SAMPLE:
+        times1 = sampler.sample(times1, TIME_SAMPLE)
+    if len(times2) > TIME_SAMPLE:
+        times2 = sampler.sample(times2, TIME_SAMPLE)
+    return BatchResult(wins, draws, losses, seconds, times1, times2)
+
+
+def percentiles(samples, fractions=(0.5, 0.9, 0.99)):
+    """
+    Finds percentiles of some samples by the nearest-rank method.
+
+    Args:
+        samples (list): The samples.
+        fractions (tuple): The percentiles wanted, as fractions.
+
+    Returns:
+        dict: 'p50' style names to values, or zeros if there are no samples.
+    """
+    ordered = sorted(samples)
+    result = {}
+    for fraction in fractions:
+        name = f"p{fraction * 100:g}"
+        if not ordered:
+            result[name] = 0.0
+        else:
+            result[name] = ordered[min(len(ordered) - 1, max(0, int(fraction * len(ordered) + 0.5) - 1))]
+    return result
+
+
+def simulate(player1, player2, games, seed=0, workers=None, batch_size=BATCH_SIZE):
+    """
+    Plays many games between two policies and summarizes the results.
+
+    Players alternate going first. With more than one worker, batches of
+    games are spread over a process pool, with only a few batches per worker
+    in flight at once.
+
+    Args:
+        player1 (str): Name of player 1's policy in POLICIES.
+        player2 (str): Name of player 2's policy.
+        games (int): Number of games to play.
+        seed (int): Seed for the run; the same seed gives the same results.
+        workers (int): Number of worker processes; defaults to the CPU count.
+        batch_size (int): Games per task.
+
+    Returns:
+        dict: Win, draw and loss rates for player 1, games per second, and
+        move time percentiles in microseconds for each player.
+
+    Example:
+        simulate('heuristic', 'random', 100000, seed=1)['win_rate']
+    """
+    for name in (player1, player2):
+        if name not in POLICIES:
+            raise ValueError(f"Unknown policy {name!r}; choose from {', '.join(POLICIES)}")
+    workers = workers or os.cpu_count() or 1
+    batches = [(first, min(batch_size, games - first)) for first in range(0, games, batch_size)]
+    results = []
+
+    if 'solved' in (player1, player2):
+        # Build the table here if it is missing, rather than in every worker at once
+        SolvedTable.open().close()
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play_batch(player1, player2, first, count, seed) for first, count in batches]
+    else:
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for first, count in batches:
+                pending.append(pool.submit(play_batch, player1, player2, first, count, seed))
+                if len(pending) >= 2 * workers:
+                    results.append(pending.popleft().result())
+            while pending:
+                results.append(pending.popleft().result())
+    elapsed = time.perf_counter() - start
+
+    wins = sum(result.wins for result in results)
+    draws = sum(result.draws for result in results)
+    losses = sum(result.losses for result in results)
+    total = max(games, 1)
+    summary = {'player1': player1, 'player2': player2, 'games': games, 'seed': seed, 'workers': workers,
+               'win_rate': wins / total, 'draw_rate': draws / total, 'loss_rate': losses / total,
+               'seconds': elapsed, 'worker_seconds': sum(result.seconds for result in results),
+               'games_per_second': games / elapsed if elapsed else 0.0}
+    for player, name in ((1, player1), (2, player2)):
+        samples = [seconds * 1e6 for result in results for seconds in getattr(result, f'times{player}')]
+        for label, value in percentiles(samples).items():
+            summary[f'player{player}_move_us_{label}'] = value
+    return summary
+
+
+def main(argv=None):
+    """
+    Runs a simulation from the command line and prints the summary.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success.
+    """
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe policies against each other.")
+    parser.add_argument('player1', choices=sorted(POLICIES), help="policy being evaluated")
+    parser.add_argument('player2', choices=sorted(POLICIES), help="opponent policy")
+    parser.add_argument('-n', '--games', type=int, default=100000, help="number of games")
+    parser.add_argument('-w', '--workers', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=0, help="seed for repeatable runs")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="games per worker task")
+    args = parser.parse_args(argv)
+
+    summary = simulate(args.player1, args.player2, args.games, args.seed, args.workers, args.batch_size)
+    for name, value in summary.items():
+        print(f"{name}: {value:,.4f}" if isinstance(value, float) else f"{name}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+'''
+Author: Bobby Jones
+Date: 10/18/26
+Description: Solves Tic Tac Toe completely, once. Every reachable position is scored by perfect play and its
+             best moves recorded in a small binary table indexed by the position's base-3 code. The table is
+             saved to disk and memory-mapped, so choosing a perfect move is one index into an array instead of
+             a search. A verify mode solves the game again and checks the saved table against it.
+Bugs: None
+Sources: https://en.wikipedia.org/wiki/Solved_game, https://docs.python.org/3/library/mmap.html
+'''
+
+from array import array
+import argparse
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from jones_bobby_TTT import FULL_BOARD, MARK_COUNT, WINNING, board_bits, canonical_key
+
+# Header of a saved table: magic, format version, number of entries
+HEADER = struct.Struct('<4sHH')
+MAGIC = b'TTTS'
+VERSION = 1
+
+# One entry per way of filling 9 squares with empty, X or O
+ENTRIES = 3 ** 9
+
+# Where the table is saved by default
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tictactoe_solved.bin')
+
+# An entry holds the best moves as a 9-bit mask, with the score (offset to stay positive) above it.
+# Entry 0 marks a position that can't be reached or where the game is already over.
+MOVE_BITS = 9
+SCORE_OFFSET = 16
+
+# Base-3 code of a bitboard: X_CODES[x] + O_CODES[o] is the position's index, with square i as digit i
+X_CODES = array('H', (sum(3 ** i for i in range(9) if bits >> i & 1) for bits in range(FULL_BOARD + 1)))
+O_CODES = array('H', (2 * code for code in X_CODES))
+
+
+def position_index(board):
+    """
+    Finds a list board's index in the solved table.
+
+    Args:
+        board (list): The 1D Tic Tac Toe board.
+
+    Returns:
+        int: The base-3 code of the board, with empty as 0, X as 1 and O as 2.
+    """
+    return X_CODES[board_bits(board, 'X')] + O_CODES[board_bits(board, 'O')]
+
+
+def solve():
+    """
+    Scores every reachable position by perfect play and records its best moves.
+
+    The whole game graph is walked from the empty board. Scores are the same
+    as negamax in jones_bobby_TTT: a win is 1 plus the empty squares left
+    after the winning move, a draw 0, a loss negative, all for the player to
+    move. Scores are shared between the 8 symmetries of a position through
+    its canonical key, so each position is only worked out once up to symmetry.
+
+    Returns:
+        array: ENTRIES 16-bit entries, indexed by base-3 position code.
+    """
+    table = array('H', bytes(2 * ENTRIES))
+    scores = {}
+
+    def score(mine, theirs):
+        key = canonical_key(mine, theirs)
+        if key in scores:
+            return scores[key]
+        taken = mine | theirs
+        empty = 9 - MARK_COUNT[taken]
+        values = []
+        for move in range(9):
+            bit = 1 << move
+            if taken & bit:
+                continue
+            placed = mine | bit
+            if WINNING[placed]:
+                value = empty
+            elif empty == 1:
+                value = 0
+            else:
+                value = -score(theirs, placed)
+            values.append((move, value))
+        best = max(value for _, value in values)
+        scores[key] = best
+        return best
+
+    def visit(x_bits, o_bits):
+        index = X_CODES[x_bits] + O_CODES[o_bits]
+        if table[index]:
+            return
+        x_to_move = MARK_COUNT[x_bits] == MARK_COUNT[o_bits]
+        mine, theirs = (x_bits, o_bits) if x_to_move else (o_bits, x_bits)
+        taken = x_bits | o_bits
+        empty = 9 - MARK_COUNT[taken]
+        best, best_mask, children = None, 0, []
+        for move in range(9):
+            bit = 1 << move
+            if taken & bit:
+                continue
+            placed = mine | bit
+            if WINNING[placed]:
+                value = empty
+            elif empty == 1:
+                value = 0
+            else:
+                value = -score(theirs, placed)
+                children.append((placed, theirs) if x_to_move else (theirs, placed))
+            if best is None or value > best:
+                best, best_mask = value, bit
+            elif value == best:
+                best_mask |= bit
+        table[index] = (best + SCORE_OFFSET) << MOVE_BITS | best_mask
+        for child in children:
+            visit(*child)
+
+    visit(0, 0)
+    return table
+
+
+def save_table(table, file_path=TABLE_FILE):
+    """
+    Saves a solved table.
+
+    Args:
+        table (array): The table from solve().
+        file_path (str): The file to write.
+    """
+    # A temp file of its own means processes saving at the same time never trip over each other
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)), suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(table)))
+            entries = array('H', table)
+            if sys.byteorder != 'little':
+                entries.byteswap()
+            entries.tofile(f)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class SolvedTable:
+    """
+    A saved solved table, memory-mapped for move queries.
+
+    Args:
+        file_path (str): The table file written by save_table.
+
+    Raises:
+        ValueError: If the file is not a complete solved table of this version.
+
+    Example:
+        with SolvedTable.open() as solved:
+            move = solved.best_move(board)
+    """
+
+    def __init__(self, file_path=TABLE_FILE):
+        self._file = open(file_path, 'rb')
+        try:
+            # Check the size first, so an empty or cut-off file fails here and not on a later lookup
+            if os.fstat(self._file.fileno()).st_size != HEADER.size + 2 * ENTRIES:
+                raise ValueError(f"{file_path} is not a solved Tic Tac Toe table")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        magic, version, entries = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or entries != ENTRIES:
+            self.close()
+            raise ValueError(f"{file_path} is not a solved Tic Tac Toe table")
+        if sys.byteorder != 'little':
+            self.entries = array('H', self._map[HEADER.size:])
+            self.entries.byteswap()
+        else:
+            self.entries = memoryview(self._map)[HEADER.size:].cast('H')
+
+    @classmethod
+    def open(cls, file_path=TABLE_FILE):
+        """
+        Opens a saved table, solving the game and saving it first if the file is missing or invalid.
+
+        Args:
+            file_path (str): The table file.
+
+        Returns:
+            SolvedTable: The opened table.
+        """
+        if os.path.exists(file_path):
+            try:
+                return cls(file_path)
+            except ValueError:
+                # Damaged, cut off or from another version; solve the game again
+                pass
+        save_table(solve(), file_path)
+        return cls(file_path)
+
+    def close(self):
+        """
+        Releases the memory-mapped file.
+        """
+        if isinstance(getattr(self, 'entries', None), memoryview):
+            self.entries.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _entry(self, board):
+        """Looks up a board's entry, rejecting finished or unreachable positions."""
+        entry = self.entries[position_index(board)]
+        if not entry:
+            raise ValueError("Position is finished or can't be reached in a game")
+        return entry
+
+    def score(self, board):
+        """
+        Returns the perfect-play score for the player to move.
+
+        Args:
+            board (list): The 1D Tic Tac Toe board.
+
+        Returns:
+            int: Positive if the player to move wins, 0 for a draw, negative for a loss.
+        """
+        return (self._entry(board) >> MOVE_BITS) - SCORE_OFFSET
+
+    def best_moves(self, board):
+        """
+        Lists every move that keeps the perfect-play score.
+
+        Args:
+            board (list): The 1D Tic Tac Toe board.
+
+        Returns:
+            list: Square indexes (0-8).
+        """
+        mask = self._entry(board) & FULL_BOARD
+        return [square for square in range(9) if mask >> square & 1]
+
+    def best_move(self, board):
+        """
+        Returns one perfect-play move, the lowest numbered of the best moves.
+
+        Args:
+            board (list): The 1D Tic Tac Toe board.
+
+        Returns:
+            int: The index for the move (0-8).
+        """
+        mask = self._entry(board) & FULL_BOARD
+        return (mask & -mask).bit_length() - 1
+
+
+def verify(file_path=TABLE_FILE):
+    """
+    Solves the game again and compares the result with a saved table.
+
+    Args:
+        file_path (str): The table file to check.
+
+    Returns:
+        list: Indexes of the entries that differ; empty if the table is correct.
+    """
+    expected = solve()
+    with SolvedTable(file_path) as solved:
+        return [index for index in range(ENTRIES) if solved.entries[index] != expected[index]]
+
+
+def main(argv=None):
+    """
+    Builds, verifies or queries the solved table.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success, 1 if verification found differences.
+    """
+    parser = argparse.ArgumentParser(description="Solve Tic Tac Toe into a lookup table.")
+    parser.add_argument('--table', default=TABLE_FILE, help="table file")
+    parser.add_argument('--build', action='store_true', help="solve the game and save the table")
+    parser.add_argument('--verify', action='store_true', help="check the saved table against a fresh solve")
+    parser.add_argument('--query', help="board as 9 characters of X, O and '.', row by row")
+    args = parser.parse_args(argv)
+
+    if args.build:
+        table = solve()
+        save_table(table, args.table)
+        print(f"Saved {sum(1 for entry in table if entry):,} positions to {args.table}")
+    if args.verify:
+        differences = verify(args.table)
+        if differences:
+            print(f"{len(differences):,} entries differ, first at index {differences[0]}")
+            return 1
+        print("Table matches a fresh solve")
+    if args.query:
+        board = [' ' if cell == '.' else cell for cell in args.query.upper()]
+        if len(board) != 9 or any(cell not in ' XO' for cell in board):
+            parser.error("--query needs exactly 9 squares of X, O or '.'")
+        with SolvedTable.open(args.table) as solved:
+            try:
+                score, moves = solved.score(board), solved.best_moves(board)
+            except ValueError as error:
+                parser.error(str(error))
+            print(f"score {score}, best moves {[move + 1 for move in moves]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Author: Bobby Jones
+Date: 10/18/26
+Description: An on-disk cache of per-speech word frequency tables, so speeches that have not changed since the
+             last run are loaded instead of counted again. Entries are checked by size and modification time,
+             then by content hash, and the least recently used entries are evicted past a size cap.
+Bugs: None
+Sources: https://docs.python.org/3/library/array.html, https://en.wikipedia.org/wiki/Cache_replacement_policies#LRU
+"""
+
+from array import array
+from collections import Counter
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+# Header of a cached table: magic, number of words, bytes of vocabulary text
+HEADER = struct.Struct('<4sIQ')
+MAGIC = b'WFC1'
+
+# Default cap on the total size of the cached tables
+MAX_BYTES = 256 * 1024 * 1024
+
+def file_digest(file_path, block_size=1024 * 1024):
+    """
+    Calculates the SHA-256 of a file's contents.
+
+    Args:
+        file_path (str): The file to hash.
+        block_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def tokenizer_fingerprint(tokenizer):
+    """
+    Summarizes the settings that affect a tokenizer's counts, so tables from different settings never mix.
+
+    Args:
+        tokenizer (Tokenizer): The tokenizer the tables are counted with.
+
+    Returns:
+        str: A short hex fingerprint.
+    """
+    settings = "\n".join(sorted(tokenizer.stop_words)) + f"\n{tokenizer.unicode_punctuation}"
+    return hashlib.sha256(settings.encode('utf-8')).hexdigest()[:16]
+
+def write_table(word_freq, file_path):
+    """
+    Saves a word frequency table as a sorted vocabulary plus an array of counts.
+
+    Args:
+        word_freq (dict): A dictionary where the keys are words and values are the frequency of each word.
+        file_path (str): The file to write.
+
+    Returns:
+        int: Number of bytes written.
+    """
+    words = sorted(word_freq)
+    counts = array('Q', (word_freq[word] for word in words))
+    vocabulary = "\n".join(words).encode('utf-8')
+    # Written beside the table and renamed over it, so a crash never leaves half a table behind
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)), suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(words), len(vocabulary)))
+            counts.tofile(f)
+            f.write(vocabulary)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return HEADER.size + counts.itemsize * len(counts) + len(vocabulary)
+
+def read_table(file_path):
+    """
+    Loads a word frequency table saved by write_table.
+
+    Args:
+        file_path (str): The file to read.
+
+    Returns:
+        Counter: The word frequencies.
+
+    Raises:
+        ValueError: If the file is not a table or is cut short.
+        EOFError: If the file ends before all the counts.
+        struct.error: If the file is shorter than the header.
+    """
+    with open(file_path, 'rb') as f:
+        magic, size, vocabulary_bytes = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{file_path} is not a cached word frequency table")
+        counts = array('Q')
+        counts.fromfile(f, size)
+        vocabulary = f.read(vocabulary_bytes)
+    if len(vocabulary) != vocabulary_bytes:
+        raise ValueError(f"{file_path} is cut short")
+    vocabulary = vocabulary.decode('utf-8')
+    words = vocabulary.split("\n") if size else []
+    return Counter(dict(zip(words, counts)))
+
+class CountCache:
+    """
+    A directory of cached word frequency tables, one per speech file.
+
+    Entries are keyed by absolute path and tokenizer settings. A file whose
+    size and modification time match its entry is a hit without reading it;
+    if they differ the file is hashed, and a matching content hash is still a
+    hit. Tables are named by content hash, so identical files share one.
+    Once the tables pass max_bytes the least recently used are deleted.
+
+    The index is written by flush(), which also runs when the cache is used
+    as a context manager.
+
+    Args:
+        directory (str): Where to keep the cache; created if missing.
+        tokenizer (Tokenizer): How speeches are counted on a miss.
+        max_bytes (int): Cap on the total size of the cached tables.
+
+    Example:
+        with CountCache('.word_cache', default_tokenizer) as cache:
+            word_freq = cache.get('kamala_harris_speech.txt')
+    """
+
+    def __init__(self, directory, tokenizer, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.tokenizer = tokenizer
+        self.max_bytes = max_bytes
+        self.fingerprint = tokenizer_fingerprint(tokenizer)
+        self.hits = 0
+        self.misses = 0
+        self._pending = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, 'index.json')
+        try:
+            with open(self._index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        self.entries = index.get('entries', {})
+        self.clock = index.get('clock', 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def _key(self, file_path):
+        """Builds the index key for a file under this cache's tokenizer settings."""
+        return f"{os.path.abspath(file_path)}|{self.fingerprint}"
+
+    def _table_path(self, digest):
+        """Names the table file for some content under this cache's tokenizer settings."""
+        return os.path.join(self.directory, f"{digest}-{self.fingerprint}.wfc")
+
+    def _touch(self, entry):
+        """Marks an entry as the most recently used."""
+        self.clock += 1
+        entry['last_used'] = self.clock
+
+    def lookup(self, file_path):
+        """
+        Loads a file's cached word frequencies if the file is unchanged.
+
+        Args:
+            file_path (str): The speech file.
+
+        Returns:
+            Counter: The cached word frequencies, or None on a miss.
+        """
+        key = self._key(file_path)
+        stat = os.stat(file_path)
+        entry = self.entries.get(key)
+        if entry and (entry['size'], entry['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            digest = entry['sha256']
+        else:
+            digest = file_digest(file_path)
+        self._pending[key] = (stat.st_size, stat.st_mtime_ns, digest)
+
+        table_path = self._table_path(digest)
+        if not os.path.exists(table_path):
+            self.misses += 1
+            return None
+
+        try:
+            word_freq = read_table(table_path)
+        except (ValueError, EOFError, struct.error):
+            # A damaged table is a miss: drop it so the file is counted and stored again
+            os.remove(table_path)
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._record(key, table_path, os.path.getsize(table_path))
+        self.hits += 1
+        return word_freq
+
+    def store(self, file_path, word_freq):
+        """
+        Caches a file's word frequencies.
+
+        Args:
+            file_path (str): The speech file the table was counted from.
+            word_freq (dict): Its word frequencies.
+        """
+        key = self._key(file_path)
+        if key not in self._pending:
+            stat = os.stat(file_path)
+            self._pending[key] = (stat.st_size, stat.st_mtime_ns, file_digest(file_path))
+        table_path = self._table_path(self._pending[key][2])
+        self._record(key, table_path, write_table(word_freq, table_path))
+        self._evict()
+
+    def get(self, file_path):
+        """
+        Returns a file's word frequencies, counting and caching them on a miss.
+
+        Args:
+            file_path (str): The speech file.
+
+        Returns:
+            Counter: The word frequencies.
+        """
+        word_freq = self.lookup(file_path)
+        if word_freq is None:
+            word_freq = self.tokenizer.count_file(file_path)
+            self.store(file_path, word_freq)
+        return word_freq
+
+    def _record(self, key, table_path, table_bytes):
+        """Points a file's index entry at its table, using the stat and hash from lookup or store."""
+        size, mtime_ns, digest = self._pending.pop(key)
+        entry = {'size': size, 'mtime_ns': mtime_ns, 'sha256': digest,
+                 'table': os.path.basename(table_path), 'bytes': table_bytes}
+        self._touch(entry)
+        self.entries[key] = entry
+
+    def _evict(self):
+        """
+        Deletes least recently used tables until the cache is under max_bytes.
+        """
+        tables = {}
+        for key, entry in self.entries.items():
+            tables.setdefault(entry['table'], []).append(key)
+        total = sum(self.entries[keys[0]]['bytes'] for keys in tables.values())
+
+        by_age = sorted(tables.items(), key=lambda item: max(self.entries[key]['last_used'] for key in item[1]))
+        for table, keys in by_age:
+            if total <= self.max_bytes:
+                break
+            total -= self.entries[keys[0]]['bytes']
+            for key in keys:
+                del self.entries[key]
+            try:
+                os.remove(os.path.join(self.directory, table))
+            except FileNotFoundError:
+                pass
+
+    def flush(self):
+        """
+        Writes the cache index to disk and deletes tables it no longer refers to.
+        """
+        temp_path = self._index_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'clock': self.clock, 'entries': self.entries}, f)
+        os.replace(temp_path, self._index_path)
+
+        in_use = {entry['table'] for entry in self.entries.values()}
+        for name in os.listdir(self.directory):
+            if name.endswith('.wfc') and name not in in_use:
+                os.remove(os.path.join(self.directory, name))
@@ -1,80 +1,566 @@
-"""
-Author: Bobby Jones
-Date: 10/29/24
-Description: This program processes text files containing speeches, calculates the frequency of words, and saves the results as CSV files. 
-Version Log: 1.1
-Bugs: None
-Features: None
-Sources:https://www.py4e.com/html3/09-dictionaries, https://www.w3schools.com/python/python_ref_dictionary.asp
-"""
-
-from collections import defaultdict
-import string
-import csv
-
-# Define file paths for the speech text files
-harris_file = r"C:\Users\bjones25\Downloads\kamala_new.txt"
-trump_file = r"C:\Users\bjones25\Downloads\cleaned_trump_speech_transcript.txt"
-
-# List of common words (stop words) to exclude
-stop_words = set(["a", "i", "the", "is", "and", "or", "in", "of", "him", "most", "get", "here", "put", "many", "lets",
-                  "there", "those", "do", "how", "like", "been", "more", "every", "these", "make", "way", "any", "just", 
-                  "into", "im", "new", "other", "same", "being", "take", "must", "very", "much", "back", "if", "want", 
-                  "made","also", "which", "going", "know", "about", "because", "always", "what", "would", "out", "up", 
-                  "let", "her", "where", "now", "were", "had", "your", "to", "it", "for", "on", "that", "this", "no", 
-                  "with", "as", "by", "our", "we", "he", "are", "us", "an", "but", "was", "has", "have", "when", "you", 
-                  "not", "she", "be", "will", "who", "my", "one", "their", "me", "all", "they", "his", "at", "so", 
-                  "them", "am", "its", "can", "than", "from"])
-
-def process_text(file_path):
-    """
-    Processes a text file to calculate the frequency of each word, excluding common stop words.
-
-    Args:
-        file_path (str): The file path to the text file containing the speech.
-
-    Returns:
-        dict: A dictionary where the keys are words and values are the frequency of each word.
-
-    Example:
-        word_freq = process_text('kamala_harris_speech.txt')
-    
-    """
-    word_freq = defaultdict(int)
-    with open(file_path, 'r') as f:
-        for line in f:
-            # Remove punctuation, convert to lowercase, and split into words
-            words = line.translate(str.maketrans('', '', string.punctuation)).lower().split()
-            for word in words:
-                if word not in stop_words:
-                    word_freq[word] += 1
-    return word_freq
-
-def save_to_csv(word_freq, filename):
-    """
-    Saves word frequency data to a CSV file, sorted by frequency in descending order.
-
-    Args:
-        word_freq (dict): A dictionary where the keys are words and values are the frequency of each word.
-        filename (str): The name of the CSV file to save the word frequency data.
-
-    Returns:
-        None
-    
-    Example:
-        save_to_csv(harris_word_freq, 'harris_word_freq.csv')
-    
-    """
-    with open(filename, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["Word", "Frequency"])  # CSV header
-        for word, freq in sorted(word_freq.items(), key=lambda item: item[1], reverse=True):
-            writer.writerow([word, freq])
-
-# Process each file to get word frequencies
-harris_word_freq = process_text(harris_file)
-trump_word_freq = process_text(trump_file)
-
-# Save word frequencies to CSV files
-save_to_csv(harris_word_freq, 'harris_word_freq.csv')
-save_to_csv(trump_word_freq, 'trump_word_freq.csv')
+"""
+Author: Bobby Jones
+Date: 10/29/24
+Description: This program processes text files containing speeches, calculates the frequency of words, and saves the results as CSV files. 
+Version Log: 1.1
+Bugs: None
+Features: None
+Sources:https://www.py4e.com/html3/09-dictionaries, https://www.w3schools.com/python/python_ref_dictionary.asp
+"""
+
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+import argparse
+import string
+import csv
+import glob
+import heapq
+import io
+import mmap
+import os
+import sys
+import timeit
+import unicodedata
+
+from jones_bobby_countcache import CountCache, tokenizer_fingerprint
+
+# Define file paths for the speech text files
+harris_file = r"C:\Users\bjones25\Downloads\kamala_new.txt"
+trump_file = r"C:\Users\bjones25\Downloads\cleaned_trump_speech_transcript.txt"
+
+# Size of the pieces large speeches are split into for parallel counting
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Number of characters read at a time when counting a file
+BLOCK_SIZE = 1024 * 1024
+
+# List of common words (stop words) to exclude
+stop_words = set(["a", "i", "the", "is", "and", "or", "in", "of", "him", "most", "get", "here", "put", "many", "lets",
+                  "there", "those", "do", "how", "like", "been", "more", "every", "these", "make", "way", "any", "just", 
+                  "into", "im", "new", "other", "same", "being", "take", "must", "very", "much", "back", "if", "want", 
+                  "made","also", "which", "going", "know", "about", "because", "always", "what", "would", "out", "up", 
+                  "let", "her", "where", "now", "were", "had", "your", "to", "it", "for", "on", "that", "this", "no", 
+                  "with", "as", "by", "our", "we", "he", "are", "us", "an", "but", "was", "has", "have", "when", "you", 
+                  "not", "she", "be", "will", "who", "my", "one", "their", "me", "all", "they", "his", "at", "so", 
+                  "them", "am", "its", "can", "than", "from"])
+
+@lru_cache(maxsize=None)
+def punctuation_table(unicode_punctuation=False):
+    """
+    Builds the str.translate table that deletes punctuation.
+
+    Tables are cached, so each process only builds each one once.
+
+    Args:
+        unicode_punctuation (bool): Also delete every Unicode punctuation
+            character (categories Pc, Pd, Ps, Pe, Pi, Pf and Po), not just ASCII.
+
+    Returns:
+        dict: A translation table for str.translate.
+    """
+    chars = set(string.punctuation)
+    if unicode_punctuation:
+        chars.update(c for c in map(chr, range(sys.maxunicode + 1))
+                     if unicodedata.category(c).startswith('P'))
+    return str.maketrans('', '', ''.join(chars))
+
+def load_stop_words(file_path):
+    """
+    Reads a stop-word list with one or more words per line.
+
+    Args:
+        file_path (str): The file path to the stop-word list.
+
+    Returns:
+        set: The stop words, lowercased.
+    """
+    with open(file_path, 'r') as f:
+        return set(f.read().lower().split())
+
+class Tokenizer:
+    """
+    Splits text into lowercase words and counts them, excluding stop words.
+
+    The punctuation table is built once per tokenizer instead of once per
+    line. Files are read in large blocks and whole blocks are split and
+    counted with Counter in one call; stop words are removed from the totals
+    at the end rather than checked word by word.
+
+    Args:
+        stop_words (iterable): Words to leave out of the counts.
+        unicode_punctuation (bool): Strip all Unicode punctuation, not just ASCII.
+
+    Example:
+        tokenizer = Tokenizer(stop_words=load_stop_words('stop_words.txt'))
+        word_freq = tokenizer.count_file('kamala_harris_speech.txt')
+    """
+
+    def __init__(self, stop_words=stop_words, unicode_punctuation=False):
+        self.stop_words = frozenset(stop_words)
+        self.unicode_punctuation = unicode_punctuation
+        self._table = punctuation_table(unicode_punctuation)
+
+    def __reduce__(self):
+        # Rebuild from the settings; the table comes from the per-process cache
+        return (Tokenizer, (self.stop_words, self.unicode_punctuation))
+
+    def tokenize(self, text):
+        """
+        Removes punctuation from text, converts it to lowercase and splits it into words.
+
+        Args:
+            text (str): The text to split.
+
+        Returns:
+            list: Every word in the text, including stop words.
+        """
+        return text.translate(self._table).lower().split()
+
+    def count_text(self, text):
+        """
+        Calculates the frequency of each word in some text, excluding stop words.
+
+        Args:
+            text (str): The text to count.
+
+        Returns:
+            Counter: Word frequencies.
+        """
+        word_freq = Counter(self.tokenize(text))
+        return self._remove_stop_words(word_freq)
+
+    def count_file(self, file_path, block_size=BLOCK_SIZE):
+        """
+        Calculates the frequency of each word in a text file, excluding stop words.
+
+        The file is read in blocks of about block_size characters, as
+        described in iter_blocks.
+
+        Args:
+            file_path (str): The file path to the text file.
+            block_size (int): Number of characters read at a time.
+
+        Returns:
+            Counter: Word frequencies.
+        """
+        word_freq = Counter()
+        for block in self.iter_blocks(file_path, block_size):
+            word_freq.update(self.tokenize(block))
+        return self._remove_stop_words(word_freq)
+
+    def iter_blocks(self, file_path, block_size=BLOCK_SIZE):
+        """
+        Reads a text file in blocks that never split a word.
+
+        Each block is cut after its last newline (or last space, for very long
+        lines) and the remainder is carried into the next block.
+
+        Args:
+            file_path (str): The file path to the text file.
+            block_size (int): Number of characters read at a time.
+
+        Returns:
+            generator: Blocks of text, each ending at a newline or space.
+        """
+        carry = ''
+        with open(file_path, 'r') as f:
+            for block in iter(lambda: f.read(block_size), ''):
+                block = carry + block
+                cut = block.rfind('\n') + 1 or block.rfind(' ') + 1
+                carry = block[cut:]
+                yield block[:cut]
+        if carry:
+            yield carry
+
+    def _remove_stop_words(self, word_freq):
+        """
+        Deletes the stop words from a frequency table.
+
+        Args:
+            word_freq (Counter): Word frequencies, modified in place.
+
+        Returns:
+            Counter: The same table.
+        """
+        for word in self.stop_words:
+            word_freq.pop(word, None)
+        return word_freq
+
+# Tokenizer used when none is given
+default_tokenizer = Tokenizer()
+
+def process_text(file_path, tokenizer=None):
+    """
+    Processes a text file to calculate the frequency of each word, excluding common stop words.
+
+    Args:
+        file_path (str): The file path to the text file containing the speech.
+        tokenizer (Tokenizer): How to split and filter words; defaults to the
+            module stop words and ASCII punctuation.
+
+    Returns:
+        Counter: A dictionary where the keys are words and values are the frequency of each word.
+
+    Example:
+        word_freq = process_text('kamala_harris_speech.txt')
+    
+    """
+    return (tokenizer or default_tokenizer).count_file(file_path)
+
+def _process_text_per_line(file_path):
+    """
+    The original line-at-a-time word counter, kept as the baseline for benchmark_tokenizer.
+
+    Args:
+        file_path (str): The file path to the text file containing the speech.
+
+    Returns:
+        dict: A dictionary where the keys are words and values are the frequency of each word.
+    """
+    word_freq = defaultdict(int)
+    with open(file_path, 'r') as f:
+        for line in f:
+            # Remove punctuation, convert to lowercase, and split into words
+            words = line.translate(str.maketrans('', '', string.punctuation)).lower().split()
+            for word in words:
+                if word not in stop_words:
+                    word_freq[word] += 1
+    return word_freq
+
+def benchmark_tokenizer(file_path, repeat=3, tokenizer=None):
+    """
+    Measures word-counting throughput of the Tokenizer against the per-line counter.
+
+    Args:
+        file_path (str): The file path to a sample text file.
+        repeat (int): Number of timed runs; the fastest run is reported.
+        tokenizer (Tokenizer): The tokenizer to measure; defaults to the module one.
+
+    Returns:
+        dict: 'per_line' and 'tokenizer' throughput in MB/s, and 'speedup'.
+    """
+    tokenizer = tokenizer or default_tokenizer
+    megabytes = os.path.getsize(file_path) / 1e6
+    results = {}
+    for name, count in (('per_line', _process_text_per_line), ('tokenizer', tokenizer.count_file)):
+        best = min(timeit.repeat(lambda: count(file_path), number=1, repeat=repeat))
+        results[name] = megabytes / best
+    results['speedup'] = results['tokenizer'] / results['per_line']
+    return results
+
+def iter_by_frequency(word_freq):
+    """
+    Yields words in descending order of frequency without sorting the whole vocabulary.
+
+    Words are bucketed by frequency and only the distinct frequencies are
+    sorted, which is a far shorter list than the vocabulary. Words with the
+    same frequency come out in table order, just as a stable sort would give.
+
+    Args:
+        word_freq (dict): A dictionary where the keys are words and values are the frequency of each word.
+
+    Returns:
+        generator: (word, frequency) pairs, most frequent first.
+    """
+    buckets = defaultdict(list)
+    for word, freq in word_freq.items():
+        buckets[freq].append(word)
+    for freq in sorted(buckets, reverse=True):
+        for word in buckets.pop(freq):
+            yield word, freq
+
+def top_words(word_freq, k):
+    """
+    Finds the k most frequent words with a heap instead of a full sort.
+
+    Args:
+        word_freq (dict): A dictionary where the keys are words and values are the frequency of each word.
+        k (int): Number of words to return.
+
+    Returns:
+        list: Up to k (word, frequency) pairs, most frequent first.
+    """
+    return heapq.nlargest(k, word_freq.items(), key=itemgetter(1))
+
+def combine_shards(shards):
+    """
+    Adds up word frequency tables from separate shards without modifying them.
+
+    Args:
+        shards (list): Word frequency tables.
+
+    Returns:
+        Counter: The combined word frequencies.
+    """
+    word_freq = Counter()
+    for shard in shards:
+        word_freq.update(shard)
+    return word_freq
+
+def save_to_csv(word_freq, filename, top_k=None):
+    """
+    Saves word frequency data to a CSV file, sorted by frequency in descending order.
+
+    Rows are streamed to the file as they are produced rather than built
+    into a sorted list first.
+
+    Args:
+        word_freq (dict or list): A dictionary where the keys are words and values are the
+            frequency of each word, or a list of such dictionaries from separate shards.
+        filename (str): The name of the CSV file to save the word frequency data.
+        top_k (int): Only save this many of the most frequent words.
+
+    Returns:
+        None
+    
+    Example:
+        save_to_csv(harris_word_freq, 'harris_word_freq.csv')
+        save_to_csv([shard1_freq, shard2_freq], 'top_words.csv', top_k=200)
+    
+    """
+    if isinstance(word_freq, (list, tuple)):
+        word_freq = combine_shards(word_freq)
+    rows = iter_by_frequency(word_freq) if top_k is None else top_words(word_freq, top_k)
+
+    with open(filename, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Word", "Frequency"])  # CSV header
+        writer.writerows(rows)
+
+def line_ranges(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Splits a text file into byte ranges that start and end on line boundaries.
+
+    Args:
+        file_path (str): The file path to the text file.
+        chunk_size (int): Approximate number of bytes per range.
+
+    Returns:
+        list: (start, end) byte offsets covering the whole file in order.
+    """
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return []
+
+    ranges = []
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+            newline = data.find(b'\n', min(start + chunk_size, size) - 1)
+            end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def count_range(file_path, start, end, tokenizer=None):
+    """
+    Calculates word frequencies for one line-aligned byte range of a text file.
+
+    Args:
+        file_path (str): The file path to the text file.
+        start (int): Offset of the first byte of the range.
+        end (int): Offset one past the last byte of the range.
+        tokenizer (Tokenizer): How to split and filter words.
+
+    Returns:
+        Counter: Word frequencies for the lines in the range.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return (tokenizer or default_tokenizer).count_text(io.TextIOWrapper(io.BytesIO(data)).read())
+
+def merge_counts(counters):
+    """
+    Merges word frequency tables with a pairwise tree reduction.
+
+    Merging neighbours level by level keeps the tables being combined about the
+    same size, instead of folding every table into one ever-growing total.
+
+    Args:
+        counters (list): Word frequency tables to merge. They may be modified.
+
+    Returns:
+        Counter: The combined word frequencies.
+    """
+    level = [c if isinstance(c, Counter) else Counter(c) for c in counters]
+    if not level:
+        return Counter()
+    while len(level) > 1:
+        merged = []
+        for i in range(0, len(level) - 1, 2):
+            level[i].update(level[i + 1])
+            merged.append(level[i])
+        if len(level) % 2:
+            merged.append(level[-1])
+        level = merged
+    return level[0]
+
+def speaker_from_directory(file_path):
+    """
+    Names the speaker of a speech after the directory it is stored in.
+
+    Args:
+        file_path (str): The file path to the speech.
+
+    Returns:
+        str: The name of the speech's parent directory.
+    """
+    return os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+
+def corpus_files(corpus):
+    """
+    Lists the speech files in a corpus.
+
+    Args:
+        corpus (str or list): A directory, searched recursively for .txt files,
+            or a list of file paths and glob patterns.
+
+    Returns:
+        list: The speech file paths.
+    """
+    if isinstance(corpus, str):
+        if os.path.isdir(corpus):
+            return sorted(glob.glob(os.path.join(corpus, '**', '*.txt'), recursive=True))
+        corpus = [corpus]
+    return expand_paths(corpus)
+
+def count_corpus(corpus, workers=None, chunk_size=CHUNK_SIZE, speaker_of=speaker_from_directory,
+                 tokenizer=None, cache=None):
+    """
+    Calculates word frequencies for every speech in a corpus using a process pool.
+
+    Large speeches are split into line-aligned chunks so that one big file is
+    spread over several workers; the chunk counts are merged back together
+    with a tree reduction.
+
+    Args:
+        corpus (str or list): A directory, or a list of file paths and glob patterns.
+        workers (int): Number of worker processes; defaults to one per CPU.
+        chunk_size (int): Approximate number of bytes counted per task.
+        speaker_of (callable): Maps a file path to its speaker's name.
+        tokenizer (Tokenizer): How to split and filter words; defaults to the
+            cache's tokenizer when a cache is given.
+        cache (CountCache): Cache of per-file counts; only files that are not
+            cached are counted, and their counts are added to it.
+
+    Returns:
+        tuple: (per_document, per_speaker) dictionaries mapping each file path
+        and each speaker to a Counter of word frequencies.
+
+    Raises:
+        ValueError: If tokenizer and the cache's tokenizer have different settings.
+
+    Example:
+        documents, speakers = count_corpus('speeches/')
+        save_to_csv(speakers['harris'], 'harris_word_freq.csv')
+    """
+    if cache is not None:
+        # Counts are stored under the cache's tokenizer settings, so they must be counted with them
+        if tokenizer is None:
+            tokenizer = cache.tokenizer
+        elif tokenizer_fingerprint(tokenizer) != cache.fingerprint:
+            raise ValueError("tokenizer does not match the cache's tokenizer settings")
+
+    files = corpus_files(corpus)
+    cached = {}
+    if cache is not None:
+        for file_path in files:
+            word_freq = cache.lookup(file_path)
+            if word_freq is not None:
+                cached[file_path] = word_freq
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = {file_path: [pool.submit(count_range, file_path, start, end, tokenizer)
+                              for start, end in line_ranges(file_path, chunk_size)]
+                  for file_path in files if file_path not in cached}
+        counted = {file_path: merge_counts([future.result() for future in futures])
+                   for file_path, futures in chunks.items()}
+
+    if cache is not None:
+        for file_path, word_freq in counted.items():
+            cache.store(file_path, word_freq)
+        cache.flush()
+    per_document = {file_path: cached[file_path] if file_path in cached else counted[file_path]
+                    for file_path in files}
+
+    by_speaker = defaultdict(list)
+    for file_path, word_freq in per_document.items():
+        by_speaker[speaker_of(file_path)].append(Counter(word_freq))
+    per_speaker = {speaker: merge_counts(tables) for speaker, tables in by_speaker.items()}
+    return per_document, per_speaker
+
+def expand_paths(patterns):
+    """
+    Expands any glob patterns in a list of paths, keeping the given order.
+
+    Args:
+        patterns (list): File paths and/or glob patterns such as 'speeches/*.txt'.
+
+    Returns:
+        list: Matching file paths; plain paths are passed through unchanged.
+    """
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+    return paths
+
+def main(argv=None):
+    """
+    Counts word frequencies for every speech named on the command line.
+
+    With no input files it processes the default Harris and Trump speeches.
+    Each input is saved as <name>_word_freq.csv in the current directory, or
+    in --output-dir if given.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 if every file was processed, 1 if any failed.
+    """
+    parser = argparse.ArgumentParser(description="Count word frequencies in speech text files.")
+    parser.add_argument('inputs', nargs='*', help="speech files or glob patterns")
+    parser.add_argument('-o', '--output-dir', default='', help="directory for the CSV files")
+    parser.add_argument('--stop-words', help="file of stop words to use instead of the built-in list")
+    parser.add_argument('--unicode', action='store_true', help="strip all Unicode punctuation")
+    parser.add_argument('--cache', help="directory of cached counts; unchanged speeches are not recounted")
+    parser.add_argument('--top', type=int, help="only save the N most frequent words")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="report counting throughput instead of writing CSV files")
+    args = parser.parse_args(argv)
+
+    tokenizer = Tokenizer(load_stop_words(args.stop_words) if args.stop_words else stop_words,
+                          unicode_punctuation=args.unicode)
+
+    if args.inputs:
+        jobs = [(file_path, os.path.splitext(os.path.basename(file_path))[0] + '_word_freq.csv')
+                for file_path in expand_paths(args.inputs)]
+    else:
+        jobs = [(harris_file, 'harris_word_freq.csv'), (trump_file, 'trump_word_freq.csv')]
+
+    cache = CountCache(args.cache, tokenizer) if args.cache else None
+    status = 0
+    for file_path, output_name in jobs:
+        try:
+            if args.benchmark:
+                results = benchmark_tokenizer(file_path, tokenizer=tokenizer)
+                print(f"{file_path}: per-line {results['per_line']:.1f} MB/s, "
+                      f"tokenizer {results['tokenizer']:.1f} MB/s ({results['speedup']:.1f}x)")
+                continue
+            word_freq = cache.get(file_path) if cache else process_text(file_path, tokenizer)
+            save_to_csv(word_freq, os.path.join(args.output_dir, output_name), args.top)
+        except (OSError, UnicodeDecodeError) as error:
+            print(f"Failed to process {file_path}: {error}", file=sys.stderr)
+            status = 1
+    if cache:
+        cache.flush()
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
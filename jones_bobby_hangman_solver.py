@@ -0,0 +1,312 @@
+'''
+Author: Bobby Jones
+Date: 10/18/26
+Description: A computer guesser for hangman that works from a real dictionary. Words are indexed once by length
+             and by which letter is at each position, as bitmasks over the words of that length, so after each
+             guess the remaining candidates are found with a few bitwise ANDs instead of rescanning the word list.
+             The next letter is the one most candidates contain, or the one whose answer splits them most evenly.
+Bugs: None
+Sources: https://en.wikipedia.org/wiki/Bit_array, https://en.wikipedia.org/wiki/Entropy_(information_theory)
+'''
+import argparse
+import math
+import random
+import string
+import sys
+import time
+
+from jones_bobby_hangman import display_board, draw_hangman
+
+# Where to look for a dictionary if none is given
+DICTIONARY_FILE = '/usr/share/dict/words'
+
+# Wrong guesses allowed, as in play_game
+MAX_WRONG = 6
+
+def load_dictionary(file_path=DICTIONARY_FILE):
+    """
+    Reads a word list, one word per line, keeping lowercase words of plain letters.
+
+    Args:
+        file_path (str): The word list.
+
+    Returns:
+        list: The distinct words, in file order.
+    """
+    words = {}
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            word = line.strip().lower()
+            if word and word.isascii() and word.isalpha():
+                words[word] = None
+    return list(words)
+
+def _bitmask(ids, size):
+    """Builds an integer with the given bits set, in time linear in size."""
+    bits = bytearray((size + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+class LengthIndex:
+    """
+    Bitmasks over all the dictionary words of one length.
+
+    Bit i of a mask stands for words[i]. at[position][letter] marks the words
+    with that letter at that position, and contains[letter] the words with
+    that letter anywhere.
+
+    Args:
+        words (list): Words that all have the same length.
+    """
+
+    def __init__(self, words):
+        self.words = words
+        self.length = len(words[0]) if words else 0
+        self.all = (1 << len(words)) - 1
+        self.at = []
+        for position in range(self.length):
+            ids = {}
+            for i, word in enumerate(words):
+                ids.setdefault(word[position], []).append(i)
+            self.at.append({letter: _bitmask(letter_ids, len(words)) for letter, letter_ids in ids.items()})
+        self.contains = {}
+        for letter in string.ascii_lowercase:
+            mask = 0
+            for position_masks in self.at:
+                mask |= position_masks.get(letter, 0)
+            if mask:
+                self.contains[letter] = mask
+
+    def decode(self, mask):
+        """
+        Lists the words whose bits are set in a mask.
+
+        Args:
+            mask (int): A candidate mask.
+
+        Returns:
+            list: The words.
+        """
+        words = []
+        while mask:
+            lowest = mask & -mask
+            words.append(self.words[lowest.bit_length() - 1])
+            mask ^= lowest
+        return words
+
+class WordIndex:
+    """
+    A dictionary indexed by word length, for HangmanSolver.
+
+    Args:
+        words (list): The dictionary words, lowercase letters only.
+
+    Example:
+        index = WordIndex(load_dictionary('words.txt'))
+        solver = HangmanSolver(index, 7)
+    """
+
+    def __init__(self, words):
+        by_length = {}
+        for word in words:
+            by_length.setdefault(len(word), []).append(word)
+        self.lengths = {length: LengthIndex(group) for length, group in by_length.items()}
+
+    def __getitem__(self, length):
+        return self.lengths[length]
+
+class HangmanSolver:
+    """
+    Guesses the letters of one hidden word of a known length.
+
+    The candidates are kept as a single bitmask. After each guess they are
+    narrowed with ANDs against the position masks: a hit keeps the words with
+    the letter at exactly the revealed positions, a miss drops every word
+    containing the letter.
+
+    Args:
+        index (WordIndex): The indexed dictionary.
+        length (int): Length of the hidden word.
+        strategy (str): 'frequency' to guess the letter most candidates contain,
+            or 'entropy' to guess the letter whose answer tells the most about
+            which candidate it is.
+
+    Example:
+        solver = HangmanSolver(index, 6)
+        letter = solver.guess()
+        solver.update(letter, [1, 4])  # the letter is at positions 1 and 4
+    """
+
+    def __init__(self, index, length, strategy='frequency'):
+        if strategy not in ('frequency', 'entropy'):
+            raise ValueError("strategy must be 'frequency' or 'entropy'")
+        if length not in index.lengths:
+            raise ValueError(f"The dictionary has no words of length {length}")
+        self.table = index[length]
+        self.strategy = strategy
+        self.candidates = self.table.all
+        self.pattern = ['_'] * length
+        self.guessed = set()
+
+    def count(self):
+        """
+        Counts the words still possible.
+        """
+        return self.candidates.bit_count()
+
+    def words(self):
+        """
+        Lists the words still possible.
+        """
+        return self.table.decode(self.candidates)
+
+    def update(self, letter, positions):
+        """
+        Narrows the candidates after the answer to a guess.
+
+        Args:
+            letter (str): The guessed letter.
+            positions (list): Where the letter is in the word; empty for a miss.
+        """
+        self.guessed.add(letter)
+        table = self.table
+        if not positions:
+            self.candidates &= ~table.contains.get(letter, 0)
+            return
+        for position in positions:
+            self.candidates &= table.at[position].get(letter, 0)
+            self.pattern[position] = letter
+        elsewhere = 0
+        for position, shown in enumerate(self.pattern):
+            if shown == '_':
+                elsewhere |= table.at[position].get(letter, 0)
+        self.candidates &= ~elsewhere
+
+    def _partition(self, letter):
+        """
+        Splits the candidates by what guessing a letter would reveal.
+
+        Returns:
+            list: The size of each group of candidates that would give the same answer.
+        """
+        table = self.table
+        hit = self.candidates & table.contains.get(letter, 0)
+        groups = [hit]
+        for position, shown in enumerate(self.pattern):
+            if shown != '_':
+                continue
+            mask = table.at[position].get(letter, 0)
+            split = []
+            for group in groups:
+                for part in (group & mask, group & ~mask):
+                    if part:
+                        split.append(part)
+            groups = split
+        sizes = [group.bit_count() for group in groups]
+        miss = (self.candidates & ~hit).bit_count()
+        if miss:
+            sizes.append(miss)
+        return sizes
+
+    def guess(self):
+        """
+        Chooses the next letter to guess.
+
+        Returns:
+            str: The letter, or None if there are no candidates left.
+        """
+        total = self.count()
+        if not total:
+            return None
+        choices = []
+        for letter, mask in self.table.contains.items():
+            if letter in self.guessed:
+                continue
+            hits = (self.candidates & mask).bit_count()
+            if not hits:
+                continue
+            if self.strategy == 'entropy':
+                information = -sum(size / total * math.log2(size / total) for size in self._partition(letter))
+                choices.append((information, hits, letter))
+            else:
+                choices.append((hits, letter))
+        return max(choices)[-1] if choices else None
+
+def auto_play(word, index, strategy='frequency', max_wrong=MAX_WRONG, verbose=False):
+    """
+    Lets the solver play a game of hangman against a hidden word.
+
+    Args:
+        word (str): The hidden word; it must be in the dictionary.
+        index (WordIndex): The indexed dictionary.
+        strategy (str): 'frequency' or 'entropy'.
+        max_wrong (int): Wrong guesses allowed.
+        verbose (bool): Show the board after every guess, as the game does.
+
+    Returns:
+        tuple: (won, list of guesses, number of wrong guesses).
+    """
+    solver = HangmanSolver(index, len(word), strategy)
+    guesses = []
+    wrong = 0
+    while wrong < max_wrong and '_' in solver.pattern:
+        if solver.count() == 1:
+            letter = next(letter for letter in solver.words()[0] if letter not in solver.guessed)
+        else:
+            letter = solver.guess()
+        if letter is None:
+            break
+        guesses.append(letter)
+        positions = [i for i, character in enumerate(word) if character == letter]
+        solver.update(letter, positions)
+        if not positions:
+            wrong += 1
+        if verbose:
+            print(f"Computer guesses '{letter}' ({solver.count():,} words left)")
+            display_board(word, solver.guessed)
+            draw_hangman(max_wrong - wrong)
+    return '_' not in solver.pattern, guesses, wrong
+
+def main(argv=None):
+    """
+    Plays the solver against one word, or against many random dictionary words and reports how it did.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success.
+    """
+    parser = argparse.ArgumentParser(description="Computer hangman guesser.")
+    parser.add_argument('dictionary', nargs='?', default=DICTIONARY_FILE, help="word list, one word per line")
+    parser.add_argument('--word', help="hidden word to play against, shown guess by guess")
+    parser.add_argument('--games', type=int, default=1000, help="random words to play against")
+    parser.add_argument('--strategy', choices=['frequency', 'entropy'], default='frequency')
+    parser.add_argument('--seed', type=int, default=0, help="seed for picking the random words")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    words = load_dictionary(args.dictionary)
+    index = WordIndex(words)
+    print(f"Indexed {len(words):,} words in {time.perf_counter() - start:.2f}s")
+
+    if args.word:
+        won, guesses, wrong = auto_play(args.word.lower(), index, args.strategy, verbose=True)
+        print(f"{'Solved' if won else 'Lost'} after {len(guesses)} guesses ({wrong} wrong)")
+        return 0
+
+    rng = random.Random(args.seed)
+    wins = wrong_total = 0
+    start = time.perf_counter()
+    for _ in range(args.games):
+        won, guesses, wrong = auto_play(rng.choice(words), index, args.strategy)
+        wins += won
+        wrong_total += wrong
+    elapsed = time.perf_counter() - start
+    print(f"Won {wins:,} of {args.games:,} games ({wins / args.games:.1%}), "
+          f"{wrong_total / args.games:.2f} wrong guesses per game, {elapsed / args.games * 1000:.2f} ms per game")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
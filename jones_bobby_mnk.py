@@ -0,0 +1,363 @@
+'''
+Author: Bobby Jones
+Date: 10/18/26
+Description: Tic Tac Toe generalized to any board size and line length (an m,n,k-game), such as 15x15
+             five-in-a-row (Gomoku). The board is a flat array, a win is found by looking only along the four
+             lines through the last move, and the computer searches with alpha-beta and iterative deepening
+             inside a time budget per move.
+Bugs: None
+Sources: https://en.wikipedia.org/wiki/M,n,k-game, https://www.chessprogramming.org/Iterative_Deepening
+'''
+
+from array import array
+import argparse
+import sys
+import time
+
+# Cell values: empty, or the player who marked it
+EMPTY = 0
+
+# Marks shown for each cell value
+MARKS = ' XO'
+
+# Steps (row, column) along the four line directions: across, down, and both diagonals
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Score of a won position; wins found sooner score a little higher
+WIN_SCORE = 10 ** 9
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget runs out."""
+
+
+class MNKBoard:
+    """
+    A board for an m,n,k-game: players take turns marking cells and the first to get k in a row wins.
+
+    Cells are kept in one flat array('b') with cell = row * width + column,
+    holding 0 for empty or 1/2 for the player. Besides the cells, the board
+    keeps running totals that are updated by play() and undo() instead of
+    being recomputed:
+
+    - how many of each player's marks are in every length-k window, and the
+      resulting evaluation score, so a position is scored in constant time;
+    - how many marks lie within radius of each cell, so only cells near the
+      action are offered as candidate moves.
+
+    Args:
+        width (int): Number of columns.
+        height (int): Number of rows.
+        k (int): Marks in a row needed to win.
+        radius (int): Candidate moves must be within this many cells of a mark.
+
+    Example:
+        board = MNKBoard(15, 15, 5)
+        board.play(board.index(7, 7))
+        move, score, depth = search(board, time_budget=1.0)
+    """
+
+    def __init__(self, width=3, height=3, k=3, radius=1):
+        if not 1 <= k <= max(width, height):
+            raise ValueError("k must fit on the board")
+        self.width = width
+        self.height = height
+        self.k = k
+        self.radius = radius
+        self.size = width * height
+        self.cells = array('b', bytes(self.size))
+        self.moves = []
+        self.winner = EMPTY
+
+        # Every length-k window, as the cells it covers, and the windows through each cell
+        self.windows = []
+        self.cell_windows = [[] for _ in range(self.size)]
+        for d_row, d_col in DIRECTIONS:
+            for row in range(height):
+                for col in range(width):
+                    end_row, end_col = row + d_row * (k - 1), col + d_col * (k - 1)
+                    if 0 <= end_row < height and 0 <= end_col < width:
+                        window = len(self.windows)
+                        cells = [(row + d_row * i) * width + col + d_col * i for i in range(k)]
+                        self.windows.append(cells)
+                        for cell in cells:
+                            self.cell_windows[cell].append(window)
+        self.counts = (None, array('b', bytes(len(self.windows))), array('b', bytes(len(self.windows))))
+
+        # Weight of a window holding n marks of one player and none of the other
+        self.weights = [0] + [10 ** n for n in range(k)]
+        self.score = 0
+
+        self.nearby = array('H', bytes(2 * self.size))
+        self.neighbors = []
+        for cell in range(self.size):
+            row, col = divmod(cell, width)
+            self.neighbors.append([r * width + c
+                                   for r in range(max(0, row - radius), min(height, row + radius + 1))
+                                   for c in range(max(0, col - radius), min(width, col + radius + 1))])
+
+    @property
+    def to_move(self):
+        """The player (1 or 2) whose turn it is."""
+        return 1 + len(self.moves) % 2
+
+    def index(self, row, col):
+        """
+        Converts a row and column (both from 0) to a cell number.
+        """
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            raise ValueError(f"({row}, {col}) is off the board")
+        return row * self.width + col
+
+    def full(self):
+        """
+        Checks if every cell is marked.
+        """
+        return len(self.moves) == self.size
+
+    def _window_value(self, window):
+        """Scores one window from player 1's side."""
+        ones, twos = self.counts[1][window], self.counts[2][window]
+        if twos == 0:
+            return self.weights[ones]
+        if ones == 0:
+            return -self.weights[twos]
+        return 0
+
+    def _is_win(self, cell, player):
+        """
+        Checks the four lines through a cell for k of the player's marks in a row.
+        """
+        cells, width, height, k = self.cells, self.width, self.height, self.k
+        row, col = divmod(cell, width)
+        for d_row, d_col in DIRECTIONS:
+            run = 1
+            for sign in (1, -1):
+                r, c = row + sign * d_row, col + sign * d_col
+                while 0 <= r < height and 0 <= c < width and cells[r * width + c] == player:
+                    run += 1
+                    r += sign * d_row
+                    c += sign * d_col
+            if run >= k:
+                return True
+        return False
+
+    def play(self, cell):
+        """
+        Marks a cell for the player to move.
+
+        Args:
+            cell (int): The cell number.
+
+        Returns:
+            bool: True if the move wins the game.
+
+        Raises:
+            ValueError: If the cell is taken or the game is already over.
+        """
+        if self.winner or self.cells[cell] != EMPTY:
+            raise ValueError(f"Cell {cell} can't be played")
+        player = self.to_move
+        self.cells[cell] = player
+        self.moves.append(cell)
+
+        counts = self.counts[player]
+        for window in self.cell_windows[cell]:
+            before = self._window_value(window)
+            counts[window] += 1
+            self.score += self._window_value(window) - before
+        for neighbor in self.neighbors[cell]:
+            self.nearby[neighbor] += 1
+
+        if self._is_win(cell, player):
+            self.winner = player
+            return True
+        return False
+
+    def undo(self):
+        """
+        Takes back the last move.
+        """
+        cell = self.moves.pop()
+        player = self.cells[cell]
+        self.cells[cell] = EMPTY
+        self.winner = EMPTY
+
+        counts = self.counts[player]
+        for window in self.cell_windows[cell]:
+            before = self._window_value(window)
+            counts[window] -= 1
+            self.score += self._window_value(window) - before
+        for neighbor in self.neighbors[cell]:
+            self.nearby[neighbor] -= 1
+
+    def candidates(self):
+        """
+        Lists the empty cells near existing marks, or the center cell on an empty board.
+
+        Returns:
+            list: Cell numbers.
+        """
+        if not self.moves:
+            return [(self.height // 2) * self.width + self.width // 2]
+        cells, nearby = self.cells, self.nearby
+        return [cell for cell in range(self.size) if nearby[cell] and cells[cell] == EMPTY]
+
+    def evaluate(self):
+        """
+        Scores the position for the player to move from the open windows.
+
+        Returns:
+            int: Higher is better for the player to move.
+        """
+        return self.score if self.to_move == 1 else -self.score
+
+    def display(self):
+        """
+        Prints the board with row and column numbers.
+        """
+        print("   " + " ".join(f"{col % 10}" for col in range(self.width)))
+        for row in range(self.height):
+            marks = self.cells[row * self.width:(row + 1) * self.width]
+            print(f"{row:2} " + " ".join(MARKS[mark] if mark else '.' for mark in marks))
+
+
+def _negamax(board, depth, alpha, beta, ply, deadline, stats):
+    """
+    Scores a position for the player to move, depth-limited, with alpha-beta pruning.
+    """
+    stats['nodes'] += 1
+    if stats['nodes'] & 1023 == 0 and time.perf_counter() > deadline:
+        raise SearchTimeout
+    if depth == 0:
+        return board.evaluate()
+    moves = board.candidates()
+    if not moves:
+        return 0
+
+    if depth > 1:
+        # Look at the moves that most improve the static score first
+        mover = 1 if board.to_move == 1 else -1
+        gains = []
+        for move in moves:
+            before = board.score
+            if board.play(move):
+                board.undo()
+                return WIN_SCORE - ply
+            gains.append((mover * (board.score - before), move))
+            board.undo()
+        moves = [move for _, move in sorted(gains, reverse=True)]
+
+    best = -WIN_SCORE * 2
+    for move in moves:
+        if board.play(move):
+            value = WIN_SCORE - ply
+        elif board.full():
+            value = 0
+        else:
+            value = -_negamax(board, depth - 1, -beta, -alpha, ply + 1, deadline, stats)
+        board.undo()
+        if value > best:
+            best = value
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+    return best
+
+
+def search(board, time_budget=1.0, max_depth=None, stats=None):
+    """
+    Finds a move for the player to move by iterative deepening inside a time budget.
+
+    Searches depth 1, then 2, and so on, trying the previous depth's best move
+    first each time. When the budget runs out, the best move from the deepest
+    finished depth is used. A winning move is played at once.
+
+    Args:
+        board (MNKBoard): The position; it is left unchanged.
+        time_budget (float): Seconds to spend on this move.
+        max_depth (int): Deepest search; defaults to the number of empty cells.
+        stats (dict): If given, 'nodes' is set to the number of positions searched.
+
+    Returns:
+        tuple: (cell, score, depth completed).
+    """
+    deadline = time.perf_counter() + time_budget
+    stats = {} if stats is None else stats
+    stats['nodes'] = 0
+    moves = board.candidates()
+    if not moves:
+        raise ValueError("No moves left")
+    for move in moves:
+        if board.play(move):
+            board.undo()
+            return move, WIN_SCORE, 1
+        board.undo()
+
+    max_depth = max_depth or board.size - len(board.moves)
+    played = len(board.moves)
+    best_move, best_score, completed = moves[0], 0, 0
+    for depth in range(1, max_depth + 1):
+        ordered = [best_move] + [move for move in moves if move != best_move]
+        alpha, depth_best, depth_score = -WIN_SCORE * 2, ordered[0], -WIN_SCORE * 2
+        try:
+            for move in ordered:
+                board.play(move)
+                value = 0 if board.full() else -_negamax(board, depth - 1, -WIN_SCORE * 2, -alpha, 1,
+                                                          deadline, stats)
+                board.undo()
+                if value > depth_score:
+                    depth_best, depth_score = move, value
+                    alpha = max(alpha, value)
+        except SearchTimeout:
+            while len(board.moves) > played:
+                board.undo()
+            break
+        best_move, best_score, completed = depth_best, depth_score, depth
+        if abs(best_score) >= WIN_SCORE - board.size or time.perf_counter() > deadline:
+            break
+    return best_move, best_score, completed
+
+
+def main(argv=None):
+    """
+    Plays an m,n,k-game in the terminal, against the computer or computer against computer.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success.
+    """
+    parser = argparse.ArgumentParser(description="Play k-in-a-row on any size board.")
+    parser.add_argument('--width', type=int, default=15, help="columns")
+    parser.add_argument('--height', type=int, default=15, help="rows")
+    parser.add_argument('-k', type=int, default=5, help="marks in a row to win")
+    parser.add_argument('--budget', type=float, default=1.0, help="computer's seconds per move")
+    parser.add_argument('--human', choices=['X', 'O'], help="play this side yourself")
+    args = parser.parse_args(argv)
+
+    board = MNKBoard(args.width, args.height, args.k)
+    while not board.winner and not board.full():
+        board.display()
+        mark = MARKS[board.to_move]
+        if mark == args.human:
+            try:
+                row, col = (int(value) for value in input(f"{mark}, enter row and column: ").split())
+                board.play(board.index(row, col))
+            except ValueError:
+                print("Invalid move! Try again.")
+            continue
+        stats = {}
+        move, score, depth = search(board, args.budget, stats=stats)
+        print(f"{mark} plays {divmod(move, board.width)} (depth {depth}, {stats['nodes']:,} nodes, score {score})")
+        board.play(move)
+
+    board.display()
+    print(f"{MARKS[board.winner]} wins!" if board.winner else "It's a tie!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
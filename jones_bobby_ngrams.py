@@ -0,0 +1,242 @@
+"""
+Author: Bobby Jones
+Date: 10/18/26
+Description: Counts two- and three-word phrases (n-grams) in speeches. Words are interned to integer ids and
+             each n-gram is packed into a single integer key, so phrase tables take far less memory than
+             tuples of strings. Results save through the same save_to_csv as single-word frequencies.
+Bugs: None
+Sources: https://en.wikipedia.org/wiki/N-gram, https://docs.python.org/3/library/collections.html#collections.Counter
+"""
+
+from collections import Counter
+from itertools import repeat
+import argparse
+import os
+import sys
+
+from jones_bobby_electiondata import default_tokenizer, expand_paths, save_to_csv
+
+# Bits given to each word id inside a packed n-gram key
+ID_BITS = 21
+ID_MASK = (1 << ID_BITS) - 1
+
+# Longest n-gram whose packed key still fits in 64 bits
+MAX_N = 64 // ID_BITS
+
+class NgramCounts:
+    """
+    Frequencies of n-word phrases, stored as packed integer keys over an interned vocabulary.
+
+    Word i of an n-gram occupies bits ID_BITS * (n - 1 - i) and up of the key.
+    items() decodes keys back to space-separated phrases, so the table can be
+    passed directly to save_to_csv.
+
+    Args:
+        n (int): Number of words per phrase, 2 to MAX_N.
+        stop_positions (tuple): One flag per word position. An n-gram is not
+            counted if a flagged position holds a stop word. Defaults to
+            flagging the first and last words, so "the border" is skipped but
+            "secure the border" is kept.
+
+    Example:
+        bigrams = count_ngrams(['harris_speech.txt'], n=2)
+        save_to_csv(bigrams, 'harris_bigram_freq.csv', top_k=200)
+    """
+
+    def __init__(self, n=2, stop_positions=None):
+        if not 2 <= n <= MAX_N:
+            raise ValueError(f"n must be between 2 and {MAX_N}")
+        if stop_positions is None:
+            stop_positions = tuple(position in (0, n - 1) for position in range(n))
+        if len(stop_positions) != n:
+            raise ValueError("stop_positions needs one flag per word position")
+
+        self.n = n
+        self.stop_positions = tuple(stop_positions)
+        self.word_ids = {}
+        self.counts = Counter()
+
+    def intern(self, words):
+        """
+        Maps words to integer ids, giving new words the next free id.
+
+        Args:
+            words (list): The words to look up.
+
+        Returns:
+            list: One id per word.
+        """
+        word_ids = self.word_ids
+        ids = [word_ids.setdefault(word, len(word_ids)) for word in words]
+        if len(word_ids) > ID_MASK + 1:
+            raise ValueError(f"Vocabulary is larger than the {ID_MASK + 1} words a packed key can hold")
+        return ids
+
+    def add_tokens(self, tokens, stop_words):
+        """
+        Counts every n-gram in a run of consecutive words.
+
+        Args:
+            tokens (list): Consecutive words, including stop words.
+            stop_words (set): Words not allowed at the flagged positions.
+        """
+        n = self.n
+        ids = self.intern(tokens)
+        is_stop = [token in stop_words for token in tokens]
+
+        windows = zip(*(ids[position:] for position in range(n)))
+        checked = [position for position, flag in enumerate(self.stop_positions) if flag]
+        if checked:
+            stops = zip(*(is_stop[position:len(tokens) - n + 1 + position] for position in checked))
+        else:
+            stops = repeat(())
+
+        keys = []
+        for window, stop in zip(windows, stops):
+            if True in stop:
+                continue
+            key = 0
+            for word_id in window:
+                key = key << ID_BITS | word_id
+            keys.append(key)
+        self.counts.update(keys)
+
+    def phrase(self, key):
+        """
+        Decodes a packed key back into its phrase.
+
+        Args:
+            key (int): A packed n-gram key.
+
+        Returns:
+            str: The words of the n-gram separated by spaces.
+        """
+        words = self._words()
+        return " ".join(words[key >> (ID_BITS * shift) & ID_MASK] for shift in range(self.n - 1, -1, -1))
+
+    def key(self, phrase):
+        """
+        Packs a phrase into its key.
+
+        Args:
+            phrase (str): n words separated by spaces.
+
+        Returns:
+            int: The packed key, or None if a word has never been seen.
+        """
+        key = 0
+        for word in phrase.split():
+            if word not in self.word_ids:
+                return None
+            key = key << ID_BITS | self.word_ids[word]
+        return key
+
+    def _words(self):
+        """
+        Lists the interned words in id order.
+
+        Returns:
+            list: The word for each id.
+        """
+        if len(getattr(self, '_word_list', ())) != len(self.word_ids):
+            self._word_list = list(self.word_ids)
+        return self._word_list
+
+    def merge(self, other):
+        """
+        Adds another table's counts into this one, remapping its word ids.
+
+        Args:
+            other (NgramCounts): A table with the same n.
+
+        Returns:
+            NgramCounts: This table.
+        """
+        if other.n != self.n:
+            raise ValueError("Only tables with the same n can be merged")
+        remap = self.intern(other._words())
+        shifts = range(self.n - 1, -1, -1)
+        for key, count in other.counts.items():
+            new_key = 0
+            for shift in shifts:
+                new_key = new_key << ID_BITS | remap[key >> (ID_BITS * shift) & ID_MASK]
+            self.counts[new_key] += count
+        return self
+
+    def __getitem__(self, phrase):
+        key = self.key(phrase)
+        return 0 if key is None else self.counts[key]
+
+    def __len__(self):
+        return len(self.counts)
+
+    def items(self):
+        """
+        Lists every phrase with its frequency.
+
+        Returns:
+            generator: (phrase, frequency) pairs.
+        """
+        return ((self.phrase(key), count) for key, count in self.counts.items())
+
+def count_ngrams(file_paths, n=2, stop_positions=None, tokenizer=None, table=None):
+    """
+    Counts the n-grams in one or more speeches.
+
+    n-grams run across line breaks, since transcripts wrap sentences over
+    lines, but not from one file into the next.
+
+    Args:
+        file_paths (list): The speech files to count, e.g. all of one speaker's speeches.
+        n (int): Number of words per phrase.
+        stop_positions (tuple): Stop-word flags per position, as for NgramCounts.
+        tokenizer (Tokenizer): How to split words; its stop words are used for filtering.
+        table (NgramCounts): Existing table to add to, instead of a new one.
+
+    Returns:
+        NgramCounts: The phrase frequencies.
+    """
+    tokenizer = tokenizer or default_tokenizer
+    if table is None:
+        table = NgramCounts(n, stop_positions)
+
+    for file_path in file_paths:
+        carry = []
+        for block in tokenizer.iter_blocks(file_path):
+            tokens = carry + tokenizer.tokenize(block)
+            table.add_tokens(tokens, tokenizer.stop_words)
+            # Keep the last n - 1 words so phrases spanning blocks are counted once
+            carry = tokens[len(tokens) - (table.n - 1):] if len(tokens) >= table.n - 1 else tokens
+    return table
+
+def main(argv=None):
+    """
+    Saves n-gram frequencies for every speech named on the command line.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success.
+    """
+    parser = argparse.ArgumentParser(description="Count phrase (n-gram) frequencies in speeches.")
+    parser.add_argument('inputs', nargs='+', help="speech files or glob patterns")
+    parser.add_argument('-n', type=int, default=2, help="words per phrase")
+    parser.add_argument('-o', '--output-dir', default='', help="directory for the CSV files")
+    parser.add_argument('--top', type=int, help="only save the N most frequent phrases")
+    parser.add_argument('--stop-positions', help="positions where stop words are not allowed, e.g. '0,2'")
+    args = parser.parse_args(argv)
+
+    stop_positions = None
+    if args.stop_positions is not None:
+        flagged = {int(position) for position in args.stop_positions.split(',') if position}
+        stop_positions = tuple(position in flagged for position in range(args.n))
+
+    for file_path in expand_paths(args.inputs):
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        table = count_ngrams([file_path], args.n, stop_positions)
+        save_to_csv(table, os.path.join(args.output_dir, f"{stem}_{args.n}gram_freq.csv"), args.top)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,9 +5,34 @@ Description: This program asks the user for dimensions of an object being shippe
 Log: 1.0
 Bugs: Some bugs include edge case issues with the classification of packages at boundary values and the handling of "Unmailable" items
 Features: None
-Sources: https://www.geeksforgeeks.org/enumerate-in-python/
+Sources: https://www.geeksforgeeks.org/enumerate-in-python/, https://docs.python.org/3/library/array.html
 '''
 
+from array import array
+from collections import OrderedDict
+import argparse
+import json
+import os
+import sys
+
+# Highest zip code
+MAX_ZIP = 99999
+
+# Default zone boundaries, used if zip_zones.json is missing
+ZIP_ZONES = [
+    (1, 6999), (7000, 19999), (20000, 35999),
+    (36000, 62999), (63000, 84999), (85000, 99999)
+]
+
+# Config file holding the zone boundaries, so they can change without editing code
+ZIP_ZONES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'zip_zones.json')
+
+# Bytes of input read per micro-batch in streaming mode
+STREAM_BLOCK_SIZE = 64 * 1024
+
+# Default number of entries a QuoteCache keeps
+QUOTE_CACHE_SIZE = 4096
+
 def determine_mail_class(length, height, thickness):
     """
     Determines the class of mail based on its dimensions.
@@ -53,6 +78,88 @@ def determine_mail_class(length, height, thickness):
     else:
         return "UNMAILABLE"
 
+class ZoneResolver:
+    """
+    Looks up the zone of a zip code in constant time.
+
+    The zone boundaries are expanded once into a 100,000-entry byte table
+    indexed by zip code, where 0 marks a zip code outside every zone.
+
+    Args:
+        zip_zones (list): (lowest zip, highest zip) for each zone, in zone order.
+
+    Example:
+        resolver = ZoneResolver.from_file('zip_zones.json')
+        resolver.zone('20500')  # 3
+    """
+
+    def __init__(self, zip_zones):
+        self.zip_zones = [(int(low), int(high)) for low, high in zip_zones]
+        if len(self.zip_zones) > 255:
+            raise ValueError("A zone table can hold at most 255 zones")
+        self.table = array('B', bytes(MAX_ZIP + 1))
+        for zone, (low, high) in enumerate(self.zip_zones, 1):
+            if not 0 <= low <= high <= MAX_ZIP:
+                raise ValueError(f"Zone {zone} has an invalid zip range {low}-{high}")
+            self.table[low:high + 1] = array('B', [zone]) * (high - low + 1)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Loads zone boundaries from a JSON file of the form {"zip_zones": [[low, high], ...]}.
+
+        Args:
+            path (str): Path to the JSON file.
+
+        Returns:
+            ZoneResolver: A resolver for those zones.
+        """
+        with open(path, 'r') as f:
+            return cls(json.load(f)['zip_zones'])
+
+    def zone(self, zip_code):
+        """
+        Finds the zone of one zip code.
+
+        Args:
+            zip_code (str or int): The zip code.
+
+        Returns:
+            int: The zone number, starting at 1.
+
+        Raises:
+            ValueError: If the zip code is outside every zone.
+        """
+        code = int(zip_code)
+        zone = self.table[code] if 0 <= code <= MAX_ZIP else 0
+        if not zone:
+            raise ValueError(f"Zip code {zip_code} is outside every zone")
+        return zone
+
+    def zones(self, zip_codes):
+        """
+        Finds the zones of many zip codes at once with a NumPy table lookup.
+
+        Args:
+            zip_codes (array): Zip codes, as numbers or strings.
+
+        Returns:
+            numpy.ndarray: The zone of each zip code, or 0 where it is outside every zone.
+        """
+        import numpy as np
+
+        codes = np.asarray(zip_codes)
+        if codes.dtype.kind not in 'iu':
+            # Strings and oversized ints go through float so the range check happens before any int64 cast
+            codes = codes.astype(np.float64)
+        inside = (codes >= 0) & (codes <= MAX_ZIP)
+        codes = np.where(inside, codes, 0).astype(np.int64)
+        table = np.frombuffer(self.table, dtype=np.uint8)
+        return np.where(inside, table[codes], 0).astype(np.int64)
+
+# Zone lookup used by calculate_zones
+zone_resolver = ZoneResolver.from_file(ZIP_ZONES_FILE) if os.path.exists(ZIP_ZONES_FILE) else ZoneResolver(ZIP_ZONES)
+
 def calculate_zones(start_zip, end_zip):
     """
     Calculates the number of zones a package will travel through based on the zip codes.
@@ -63,16 +170,11 @@ def calculate_zones(start_zip, end_zip):
 
     Returns:
         int: The number of zones the mail must travel through.
+
+    Raises:
+        ValueError: If either zip code is outside every zone.
     """
-    zip_zones = [
-        (1, 6999), (7000, 19999), (20000, 35999), 
-        (36000, 62999), (63000, 84999), (85000, 99999)
-    ]
-    
-    start_zone = next(i+1 for i, (low, high) in enumerate(zip_zones) if low <= int(start_zip) <= high)
-    end_zone = next(i+1 for i, (low, high) in enumerate(zip_zones) if low <= int(end_zip) <= high)
-    
-    return abs(end_zone - start_zone)
+    return abs(zone_resolver.zone(end_zip) - zone_resolver.zone(start_zip))
 
 def calculate_postage(mail_class, zones):
     """
@@ -115,17 +217,287 @@ def format_postage_cost(cost):
         return formatted_cost
     return cost
 
-def main():
+def quote(length, height, thickness, start_zip, end_zip):
+    """
+    Calculates the formatted postage for one piece of mail at the rates in effect today, the same way main prints it.
+
+    Args:
+        length (float): The length of the mail.
+        height (float): The height of the mail.
+        thickness (float): The thickness of the mail.
+        start_zip (str): Starting zip code.
+        end_zip (str): Ending zip code.
+
+    Returns:
+        str: The cost without a leading zero, or "UNMAILABLE".
+
+    Raises:
+        ValueError: If the mail is mailable and a zip code is outside every zone.
+    """
+    from jones_bobby_postrates import rate_book
+
+    return format_postage_cost(rate_book.quote(length, height, thickness, start_zip, end_zip))
+
+class QuoteCache:
+    """
+    Remembers recent mail classes and quotes, for streams of repeated shipment shapes.
+
+    Dimensions are normalized to floats, so 4, "4" and 4.0 share an entry.
+    Mail classes are keyed on the dimensions alone and quotes on the
+    dimensions plus the number of zones travelled, which is all a cost
+    depends on. Once the cache holds max_size entries the least recently used
+    is dropped. Each call to mail_class() or quote() counts as one hit or miss.
+
+    By default it prices with the built-in rates of determine_mail_class and
+    calculate_postage, and does not follow rate schedules: quote() can differ
+    from it once a new schedule is in effect. Use rate_book.quote_cache() from
+    jones_bobby_postrates for a cache that always prices like quote(). Call
+    invalidate() whenever the functions it was given change their answers.
+
+    Args:
+        max_size (int): Most entries kept.
+        classify (function): Gives the class name for length, height, thickness.
+        price (function): Gives the cost for a class name and zones travelled.
+
+    Example:
+        cache = QuoteCache(1024)
+        cache.quote(4.0, 5.0, 0.008, '10000', '85000')  # '.32'
+        cache.stats()['hits']
+    """
+
+    def __init__(self, max_size=QUOTE_CACHE_SIZE, classify=determine_mail_class, price=calculate_postage):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.classify = classify
+        self.price = price
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key):
+        """Returns the cached value for a key and marks it most recently used, or None on a miss."""
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value):
+        """Stores a value, dropping the least recently used entry if the cache is full."""
+        self.entries[key] = value
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return value
+
+    def mail_class(self, length, height, thickness):
+        """
+        Determines the class of mail, using the cache when the dimensions were seen before.
+
+        Args:
+            length (float): The length of the mail.
+            height (float): The height of the mail.
+            thickness (float): The thickness of the mail.
+
+        Returns:
+            str: The class of the mail.
+        """
+        key = (float(length), float(height), float(thickness))
+        mail_class = self._get(key)
+        if mail_class is None:
+            self.misses += 1
+            return self._put(key, self.classify(*key))
+        self.hits += 1
+        return mail_class
+
+    def quote(self, length, height, thickness, start_zip, end_zip):
+        """
+        Calculates the formatted postage with classify and price, using the cache where possible.
+
+        It is a hit only if neither the class nor the cost had to be worked out.
+
+        Args:
+            length (float): The length of the mail.
+            height (float): The height of the mail.
+            thickness (float): The thickness of the mail.
+            start_zip (str): Starting zip code.
+            end_zip (str): Ending zip code.
+
+        Returns:
+            str: The cost without a leading zero, or "UNMAILABLE".
+
+        Raises:
+            ValueError: If the mail is mailable and a zip code is outside every zone.
+        """
+        dimensions = (float(length), float(height), float(thickness))
+        mail_class = self._get(dimensions)
+        hit = mail_class is not None
+        if not hit:
+            mail_class = self._put(dimensions, self.classify(*dimensions))
+        if mail_class == "UNMAILABLE":
+            cost = "UNMAILABLE"
+        else:
+            zones = calculate_zones(start_zip, end_zip)
+            key = dimensions + (zones,)
+            cost = self._get(key)
+            if cost is None:
+                hit = False
+                cost = self._put(key, format_postage_cost(self.price(mail_class, zones)))
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return cost
+
+    def invalidate(self, *args):
+        """
+        Empties the cache, e.g. after the rates change. Takes and ignores any
+        arguments so it can be used directly as a change callback.
+        """
+        self.entries.clear()
+
+    def stats(self):
+        """
+        Summarizes how well the cache is doing.
+
+        Returns:
+            dict: hits, misses, hit rate and the number of entries held.
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self.entries), 'max_size': self.max_size}
+
+def parse_item(line):
+    """
+    Splits one comma-separated input line into the values quote takes.
+
+    Args:
+        line (str): length, height, thickness, start zip, end zip.
+
+    Returns:
+        tuple: (length, height, thickness, start zip, end zip), with the zip codes as ints.
+
+    Raises:
+        ValueError: If the line does not have five fields, a field is not a number,
+            or a zip code is outside 0-99999.
+    """
+    fields = line.split(',')
+    if len(fields) != 5:
+        raise ValueError(f"expected 5 comma-separated fields, got {len(fields)}")
+    start_zip, end_zip = int(fields[3]), int(fields[4])
+    for zip_code in (start_zip, end_zip):
+        if not 0 <= zip_code <= MAX_ZIP:
+            raise ValueError(f"zip code {zip_code} is not between 0 and {MAX_ZIP}")
+    return float(fields[0]), float(fields[1]), float(fields[2]), start_zip, end_zip
+
+def price_lines(lines, first_line=1, errors=None):
+    """
+    Prices a micro-batch of input lines together with the vectorized batch pricer.
+
+    Malformed lines are reported to errors with their line number, in line
+    order, and give "ERROR" in place of a cost. Blank lines give an empty
+    result, so there is exactly one result per input line.
+
+    Args:
+        lines (list): The input lines.
+        first_line (int): Line number of the first line, for error messages.
+        errors: Open text file for error reports; defaults to stderr.
+
+    Returns:
+        list: One formatted result per input line.
+    """
+    from jones_bobby_postoffice_batch import format_costs, price_batch
+
+    errors = errors or sys.stderr
+    results = []
+    rows = []
+    slots = []
+    problems = []
+    for line_number, line in enumerate(lines, first_line):
+        if not line.strip():
+            results.append("")
+            continue
+        try:
+            rows.append(parse_item(line))
+        except ValueError as error:
+            problems.append((line_number, error))
+            results.append("ERROR")
+            continue
+        slots.append((len(results), line_number))
+        results.append(None)
+
+    if rows:
+        try:
+            priced = format_costs(*price_batch(*zip(*rows)))
+        except ValueError:
+            # Some zip code is outside every zone; price row by row to find which
+            priced = []
+            for row, (_, line_number) in zip(rows, slots):
+                try:
+                    priced.append(quote(*row))
+                except ValueError as error:
+                    problems.append((line_number, error))
+                    priced.append("ERROR")
+        for (slot, _), result in zip(slots, priced):
+            results[slot] = result
+
+    problems.sort(key=lambda problem: problem[0])
+    errors.write("".join(f"line {line_number}: {error}\n" for line_number, error in problems))
+    return results
+
+def stream_prices(infile, outfile, errors=None, block_size=STREAM_BLOCK_SIZE):
+    """
+    Prices every line of a comma-separated input stream in constant memory.
+
+    The input is read in blocks of about block_size bytes, each block is
+    priced as one micro-batch, and its results are written with one write.
+
+    Args:
+        infile: Open text file of length, height, thickness, start zip, end zip lines.
+        outfile: Open text file for the results, one per line.
+        errors: Open text file for malformed line reports; defaults to stderr.
+        block_size (int): Approximate bytes of input per micro-batch.
+
+    Returns:
+        int: Number of malformed lines.
+    """
+    line_number = 1
+    malformed = 0
+    while True:
+        lines = infile.readlines(block_size)
+        if not lines:
+            return malformed
+        results = price_lines(lines, line_number, errors)
+        malformed += results.count("ERROR")
+        outfile.write("".join(result + "\n" for result in results))
+        line_number += len(lines)
+
+def main(argv=None):
     """
     Main function that takes user input, processes it, and outputs the postage cost.
 
     Input:
         Each input line contains: length (float), height (float), thickness (float),
-        starting zip code (str), ending zip code (str).
+        starting zip code (str), ending zip code (str). With --stream, lines are read
+        from a file or stdin until it ends instead of prompting five times.
 
     Output:
         Prints the cost of mailing each piece of mail. If the mail is unmailable, prints "UNMAILABLE".
+
+    Returns:
+        int: 0 on success, 1 if streaming found malformed lines.
     """
+    parser = argparse.ArgumentParser(description="Calculate the postage for pieces of mail.")
+    parser.add_argument('--stream', nargs='?', const='-', metavar='FILE',
+                        help="price every line of FILE (or stdin) without prompting")
+    args = parser.parse_args(argv)
+
+    if args.stream is not None:
+        if args.stream == '-':
+            return 1 if stream_prices(sys.stdin, sys.stdout) else 0
+        with open(args.stream, 'r') as infile:
+            return 1 if stream_prices(infile, sys.stdout) else 0
+
     # Input
     for _ in range(5):
         input_data = input("Enter length, height, thickness, start zip, end zip (comma-separated): ").split(',')
@@ -135,26 +507,11 @@ def main():
         start_zip = input_data[3]
         end_zip = input_data[4]
         
-        # Determine mail class
-        mail_class = determine_mail_class(length, height, thickness)
-        
-        # If mail is unmailable, print and continue to next item
-        if mail_class == "UNMAILABLE":
-            print("UNMAILABLE")
-            continue
-        
-        # Calculate zones
-        zones = calculate_zones(start_zip, end_zip)
-        
-        # Calculate postage
-        postage_cost = calculate_postage(mail_class, zones)
-        
-        # Format the postage cost
-        formatted_cost = format_postage_cost(postage_cost)
-        
-        # Output result
-        print(formatted_cost)
+        # Price with the rate schedule in effect, the same as --stream and quote()
+        print(quote(length, height, thickness, start_zip, end_zip))
+
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
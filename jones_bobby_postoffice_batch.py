@@ -0,0 +1,166 @@
+'''
+Author: Bobby Jones
+Date: 10/18/26
+Description: Prices whole columns of shipments at once with NumPy, for manifests too large to price one item at a
+             time. Mail classes come from boolean masks over the dimension arrays, built from the rate schedule in
+             effect, and zones and rates from array lookups, so every cost matches RateBook.quote exactly.
+Bugs: None
+Sources: https://numpy.org/doc/stable/reference/generated/numpy.select.html
+'''
+
+import math
+import sys
+
+import numpy as np
+
+from jones_bobby_postoffice import format_postage_cost, parse_item, stream_prices, zone_resolver
+from jones_bobby_postrates import rate_book
+
+# Cost arrays already built, by rate schedule
+_cost_tables = {}
+
+def cost_table(rates):
+    """
+    Lays out a rate schedule's costs as a (class code x zones travelled) array.
+
+    Args:
+        rates (RateSchedule): The schedule.
+
+    Returns:
+        numpy.ndarray: The costs, with a last row of NaN for the unmailable code.
+    """
+    table = _cost_tables.get(rates)
+    if table is None:
+        table = np.full((rates.unmailable + 1, rates.zones), np.nan)
+        table[:rates.unmailable] = np.frombuffer(rates.costs, dtype=np.float64).reshape(rates.unmailable, rates.zones)
+        _cost_tables[rates] = table
+    return table
+
+def classify(length, height, thickness, rates=None):
+    """
+    Determines the class of many pieces of mail at once.
+
+    Args:
+        length (array): The length of each piece.
+        height (array): The height of each piece.
+        thickness (array): The thickness of each piece.
+        rates (RateSchedule): The schedule to classify with; defaults to the one in effect today.
+
+    Returns:
+        numpy.ndarray: The class code of each piece; rates.names[code] is its class.
+    """
+    rates = rates or rate_book.schedule_for()
+    length = np.asarray(length, dtype=float)
+    height = np.asarray(height, dtype=float)
+    thickness = np.asarray(thickness, dtype=float)
+
+    perimeter = 2 * height + 2 * thickness
+    values = (length, height, thickness, length + perimeter)
+
+    conditions = []
+    for rule in rates.rules:
+        condition = np.ones(length.shape, dtype=bool)
+        for measure, low, high, low_inclusive, high_inclusive in rule:
+            value = values[measure]
+            condition &= (low <= value) if low_inclusive else (low < value)
+            condition &= (value <= high) if high_inclusive else (value < high)
+        conditions.append(condition)
+    # np.select takes the first true condition, matching the order the classes are tried in
+    codes = np.select(conditions, range(rates.unmailable), default=rates.unmailable)
+    return codes.astype(np.min_scalar_type(rates.unmailable))
+
+def price_batch(length, height, thickness, start_zip, end_zip, date=None):
+    """
+    Calculates the postage for many pieces of mail at once, at the rates in effect on a date.
+
+    Args:
+        length (array): The length of each piece.
+        height (array): The height of each piece.
+        thickness (array): The thickness of each piece.
+        start_zip (array): Starting zip code of each piece.
+        end_zip (array): Ending zip code of each piece.
+        date (datetime.date or str): The shipping date; defaults to today.
+
+    Returns:
+        tuple: (class codes, costs). Costs are NaN for UNMAILABLE pieces.
+
+    Raises:
+        ValueError: If a mailable piece has a zip code outside every zone.
+    """
+    rates = rate_book.schedule_for(date)
+    codes = classify(length, height, thickness, rates)
+    start_zone = zone_resolver.zones(start_zip)
+    end_zone = zone_resolver.zones(end_zip)
+
+    mailable = codes != rates.unmailable
+    bad = mailable & ((start_zone == 0) | (end_zone == 0))
+    if bad.any():
+        row = int(np.flatnonzero(bad)[0])
+        raise ValueError(f"Zip code outside every zone in row {row}")
+
+    zones = np.abs(end_zone - start_zone)
+    costs = cost_table(rates)[codes, np.where(mailable, zones, 0)]
+    return codes, costs
+
+def format_costs(codes, costs):
+    """
+    Formats batch costs the same way main prints them.
+
+    Args:
+        codes (array): Class codes from price_batch; unmailable pieces are told apart by their NaN cost.
+        costs (array): Costs from price_batch.
+
+    Returns:
+        list: "UNMAILABLE" or the cost without a leading zero, for each piece.
+    """
+    return ["UNMAILABLE" if math.isnan(cost) else format_postage_cost(cost) for cost in costs.tolist()]
+
+def read_manifest(infile):
+    """
+    Reads a manifest of comma-separated length, height, thickness, start zip and end zip lines into columns.
+
+    Blank lines are skipped.
+
+    Args:
+        infile: An open text file or any iterable of lines.
+
+    Returns:
+        tuple: (length, height, thickness, start_zip, end_zip) arrays.
+
+    Raises:
+        ValueError: If a line is malformed; the message gives its line number.
+    """
+    rows = []
+    for line_number, line in enumerate(infile, 1):
+        if not line.strip():
+            continue
+        try:
+            rows.append(parse_item(line))
+        except ValueError as error:
+            raise ValueError(f"line {line_number}: {error}") from None
+    if not rows:
+        return tuple(np.zeros(0) for _ in range(5))
+    columns = tuple(zip(*rows))
+    return (np.array(columns[0]), np.array(columns[1]), np.array(columns[2]),
+            np.array(columns[3], dtype=np.int64), np.array(columns[4], dtype=np.int64))
+
+def price_manifest(infile, outfile, errors=None):
+    """
+    Prices every line of a manifest and writes one result per line.
+
+    Lines are priced in micro-batches like --stream, so a malformed line or a
+    zip code outside every zone gives ERROR for that line, reported to errors
+    with its line number, and the rest of the manifest is still priced.
+
+    Args:
+        infile: Open text file of comma-separated length, height, thickness, start zip, end zip.
+        outfile: Open text file for the formatted costs.
+        errors: Open text file for malformed line reports; defaults to stderr.
+
+    Returns:
+        int: Number of malformed lines.
+    """
+    return stream_prices(infile, outfile, errors)
+
+if __name__ == "__main__":
+    sys.exit(1 if price_manifest(sys.stdin, sys.stdout) else 0)
@@ -0,0 +1,417 @@
+'''
+Author: Bobby Jones
+Date: 10/18/26
+Description: A rules engine for mail classes and postage rates. Class bounds and rates are read from versioned
+             rate schedules instead of if/elif chains, compiled to integer class codes and a precomputed
+             (class x zone) cost table, so a quote is one table lookup. Several schedules can be loaded at once
+             and are picked by effective date, so back-dated shipments are priced at the rates of their day.
+Bugs: None
+Sources: https://docs.python.org/3/library/bisect.html, https://en.wikipedia.org/wiki/Interval_(mathematics)
+'''
+
+from array import array
+from bisect import bisect_right
+import argparse
+import datetime
+import json
+import os
+import sys
+
+from jones_bobby_postoffice import QUOTE_CACHE_SIZE, QuoteCache, calculate_zones, format_postage_cost, zone_resolver
+
+# Measurements a class bound can test, in the order they are passed around
+MEASURES = ("length", "height", "thickness", "length_plus_perimeter")
+
+# Class name given to anything no rule matches
+UNMAILABLE = "UNMAILABLE"
+
+# The rates calculate_postage and determine_mail_class use, as a rate schedule. Bounds are written in
+# interval notation: "[" and "]" include the end point, "(" and ")" leave it out.
+DEFAULT_SCHEDULE = {
+    "version": "1.0",
+    "effective": "2024-09-30",
+    "classes": [
+        {"name": "REGULAR POST CARD", "base": 0.20, "per_zone": 0.03,
+         "bounds": {"length": "[3.5, 4.25]", "height": "[3.5, 6]", "thickness": "[0.007, 0.016]"}},
+        {"name": "LARGE POST CARD", "base": 0.37, "per_zone": 0.03,
+         "bounds": {"length": "(4.25, 6]", "height": "(6, 11.5]", "thickness": "[0.007, 0.015]"}},
+        {"name": "ENVELOPE", "base": 0.37, "per_zone": 0.04,
+         "bounds": {"length": "[3.5, 6.125]", "height": "[5, 11.5]", "thickness": "[0.016, 0.25]"}},
+        {"name": "LARGE ENVELOPE", "base": 0.60, "per_zone": 0.05,
+         "bounds": {"length": "(6.125, 24]", "height": "[11, 18]", "thickness": "[0.25, 0.5]"}},
+        {"name": "PACKAGE", "base": 2.95, "per_zone": 0.25,
+         "bounds": {"length_plus_perimeter": "(-inf, 84]"}},
+        {"name": "LARGE PACKAGE", "base": 3.95, "per_zone": 0.35,
+         "bounds": {"length_plus_perimeter": "(84, 130]"}},
+    ],
+}
+
+# Rate schedules file, so rates can change without editing code
+RATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'postage_rates.json')
+
+def parse_interval(text):
+    """
+    Parses a bound written in interval notation, such as "(4.25, 6]".
+
+    Args:
+        text (str): The interval. Either end may be "inf" or "-inf".
+
+    Returns:
+        tuple: (low, high, low inclusive, high inclusive).
+
+    Raises:
+        ValueError: If the text is not an interval.
+    """
+    text = text.strip()
+    if len(text) < 5 or text[0] not in "[(" or text[-1] not in "])" or text.count(",") != 1:
+        raise ValueError(f"Bad interval {text!r}")
+    low, high = (float(end) for end in text[1:-1].split(","))
+    if low > high:
+        raise ValueError(f"Empty interval {text!r}")
+    return low, high, text[0] == "[", text[-1] == "]"
+
+class RateSchedule:
+    """
+    One version of the mail class rules and postage rates, compiled for lookups.
+
+    Classes are tried in the order they are listed and the first whose bounds
+    all hold wins, the same as the if/elif chain in determine_mail_class. Each
+    class's position is its integer code; UNMAILABLE is the code after the last
+    class. Costs for every (class, zones travelled) pair are worked out once
+    with round(base + per_zone * zones, 2), the formula calculate_postage uses.
+
+    Args:
+        schedule (dict): "version", "effective" (ISO date) and "classes", each with
+            "name", "base", "per_zone" and "bounds" (measure to interval).
+        zones (int): Number of zones, so zones travelled runs from 0 to zones - 1.
+
+    Example:
+        rates = RateSchedule(DEFAULT_SCHEDULE)
+        rates.cost(rates.classify(4.0, 5.0, 0.008), 5)  # 0.35
+    """
+
+    def __init__(self, schedule, zones=None):
+        self.version = str(schedule["version"])
+        self.effective = datetime.date.fromisoformat(schedule["effective"])
+        self.zones = len(zone_resolver.zip_zones) if zones is None else zones
+        self.names = []
+        self.rules = []
+        self.costs = array('d')
+
+        for mail_class in schedule["classes"]:
+            rule = []
+            for measure, interval in mail_class.get("bounds", {}).items():
+                if measure not in MEASURES:
+                    raise ValueError(f"{mail_class['name']} has a bound on unknown measure {measure!r}")
+                rule.append((MEASURES.index(measure),) + parse_interval(interval))
+            self.names.append(mail_class["name"])
+            self.rules.append(tuple(rule))
+            base, per_zone = float(mail_class["base"]), float(mail_class["per_zone"])
+            self.costs.extend(round(base + per_zone * zones, 2) for zones in range(self.zones))
+
+        self.unmailable = len(self.names)
+        self.names.append(UNMAILABLE)
+
+    def classify(self, length, height, thickness):
+        """
+        Determines the class code of a piece of mail.
+
+        Args:
+            length (float): The length of the mail.
+            height (float): The height of the mail.
+            thickness (float): The thickness of the mail.
+
+        Returns:
+            int: The class code; names[code] is the class name.
+        """
+        values = (length, height, thickness, length + (2 * height + 2 * thickness))
+        for code, rule in enumerate(self.rules):
+            for measure, low, high, low_inclusive, high_inclusive in rule:
+                value = values[measure]
+                if not ((low <= value) if low_inclusive else (low < value)):
+                    break
+                if not ((value <= high) if high_inclusive else (value < high)):
+                    break
+            else:
+                return code
+        return self.unmailable
+
+    def cost(self, code, zones):
+        """
+        Looks up the postage for a class code and number of zones.
+
+        Args:
+            code (int): A class code from classify.
+            zones (int): The number of zones the mail travels through.
+
+        Returns:
+            float: The cost, or "UNMAILABLE" for the unmailable code.
+        """
+        if code == self.unmailable:
+            return UNMAILABLE
+        if not 0 <= zones < self.zones:
+            raise ValueError(f"Zones travelled must be between 0 and {self.zones - 1}")
+        return self.costs[code * self.zones + zones]
+
+    def cost_matrix(self):
+        """
+        Lists the cost table as one row per mailable class.
+
+        Returns:
+            list: Rows of costs indexed by zones travelled.
+        """
+        return [self.costs[row:row + self.zones].tolist() for row in range(0, len(self.costs), self.zones)]
+
+class ScheduledQuoteCache(QuoteCache):
+    """
+    A QuoteCache that prices with whichever schedule of a RateBook is in effect.
+
+    The schedule is looked up once per call and its effective date is part of
+    every key, so quotes cached under one schedule are never returned once the
+    next one takes effect. Mail classes are cached as class codes of that
+    schedule and priced by code, so a later schedule may rename its classes.
+
+    Args:
+        book (RateBook): The rate schedules to price with.
+        max_size (int): Most entries kept.
+        date (datetime.date or str): The shipping date to price at; defaults to
+            today, checked on every call.
+    """
+
+    def __init__(self, book, max_size=QUOTE_CACHE_SIZE, date=None):
+        super().__init__(max_size)
+        self.book = book
+        self.date = date
+
+    def _code(self, rates, dimensions):
+        """
+        Returns the key, class code and whether it was cached, for some dimensions under a schedule.
+        """
+        key = (rates.effective,) + dimensions
+        code = self._get(key)
+        if code is None:
+            return key, self._put(key, rates.classify(*dimensions)), False
+        return key, code, True
+
+    def mail_class(self, length, height, thickness):
+        """
+        Determines the class of mail under the schedule in effect.
+
+        Args:
+            length (float): The length of the mail.
+            height (float): The height of the mail.
+            thickness (float): The thickness of the mail.
+
+        Returns:
+            str: The class of the mail.
+        """
+        rates = self.book.schedule_for(self.date)
+        _, code, hit = self._code(rates, (float(length), float(height), float(thickness)))
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return rates.names[code]
+
+    def quote(self, length, height, thickness, start_zip, end_zip):
+        """
+        Calculates the formatted postage under the schedule in effect, using the cache where possible.
+
+        Args:
+            length (float): The length of the mail.
+            height (float): The height of the mail.
+            thickness (float): The thickness of the mail.
+            start_zip (str): Starting zip code.
+            end_zip (str): Ending zip code.
+
+        Returns:
+            str: The cost without a leading zero, or "UNMAILABLE".
+        """
+        rates = self.book.schedule_for(self.date)
+        key, code, hit = self._code(rates, (float(length), float(height), float(thickness)))
+        if code == rates.unmailable:
+            cost = UNMAILABLE
+        else:
+            zones = calculate_zones(start_zip, end_zip)
+            key += (zones,)
+            cost = self._get(key)
+            if cost is None:
+                hit = False
+                cost = self._put(key, format_postage_cost(rates.cost(code, zones)))
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return cost
+
+class RateBook:
+    """
+    Every loaded rate schedule, picked by effective date.
+
+    A schedule applies from its effective date until the next one starts.
+    Functions passed to subscribe() are called with the new schedule whenever
+    one is added, so caches of old prices can be cleared.
+
+    Args:
+        schedules (list): Rate schedules as dictionaries.
+
+    Example:
+        book = RateBook.from_file('postage_rates.json')
+        book.quote(4.0, 5.0, 0.008, '10000', '85000', date='2024-10-01')
+    """
+
+    def __init__(self, schedules=()):
+        self.schedules = []
+        self.dates = []
+        self.subscribers = []
+        for schedule in schedules:
+            self.add(schedule)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Loads rate schedules from a JSON file of the form {"schedules": [...]}.
+
+        Args:
+            path (str): Path to the JSON file.
+
+        Returns:
+            RateBook: A book holding every schedule in the file.
+        """
+        with open(path, 'r') as f:
+            return cls(json.load(f)["schedules"])
+
+    def add(self, schedule):
+        """
+        Compiles a rate schedule and adds it to the book.
+
+        Args:
+            schedule (dict or RateSchedule): The schedule to add. One with the same
+                effective date as a loaded schedule replaces it.
+
+        Returns:
+            RateSchedule: The compiled schedule.
+        """
+        if not isinstance(schedule, RateSchedule):
+            schedule = RateSchedule(schedule)
+        position = bisect_right(self.dates, schedule.effective)
+        if position and self.dates[position - 1] == schedule.effective:
+            self.schedules[position - 1] = schedule
+        else:
+            self.dates.insert(position, schedule.effective)
+            self.schedules.insert(position, schedule)
+        for callback in list(self.subscribers):
+            callback(schedule)
+        return schedule
+
+    def subscribe(self, callback):
+        """
+        Registers a function to call with each schedule added from now on.
+
+        Args:
+            callback (function): Called as callback(schedule).
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        Stops calling a function registered with subscribe.
+
+        Args:
+            callback (function): The registered function.
+        """
+        self.subscribers.remove(callback)
+
+    def schedule_for(self, date=None):
+        """
+        Finds the schedule in effect on a date.
+
+        Args:
+            date (datetime.date or str): The shipping date; defaults to today.
+
+        Returns:
+            RateSchedule: The latest schedule effective on or before the date.
+
+        Raises:
+            ValueError: If no schedule was in effect yet.
+        """
+        if date is None:
+            date = datetime.date.today()
+        elif isinstance(date, str):
+            date = datetime.date.fromisoformat(date)
+        position = bisect_right(self.dates, date)
+        if not position:
+            raise ValueError(f"No postage rates in effect on {date}")
+        return self.schedules[position - 1]
+
+    def quote(self, length, height, thickness, start_zip, end_zip, date=None):
+        """
+        Calculates the postage for a piece of mail.
+
+        Args:
+            length (float): The length of the mail.
+            height (float): The height of the mail.
+            thickness (float): The thickness of the mail.
+            start_zip (str): Starting zip code.
+            end_zip (str): Ending zip code.
+            date (datetime.date or str): The shipping date; defaults to today.
+
+        Returns:
+            float: The cost, or "UNMAILABLE".
+        """
+        rates = self.schedule_for(date)
+        code = rates.classify(length, height, thickness)
+        if code == rates.unmailable:
+            return UNMAILABLE
+        return rates.cost(code, calculate_zones(start_zip, end_zip))
+
+    def quote_cache(self, max_size=QUOTE_CACHE_SIZE, date=None):
+        """
+        Makes a quote cache that prices with this book and is cleared whenever a schedule is added.
+
+        Args:
+            max_size (int): Most entries kept.
+            date (datetime.date or str): The shipping date to price at; defaults to
+                today, checked on each call.
+
+        Returns:
+            ScheduledQuoteCache: The subscribed cache.
+        """
+        cache = ScheduledQuoteCache(self, max_size, date)
+        self.subscribe(cache.invalidate)
+        return cache
+
+# Rate schedules used by default
+rate_book = RateBook.from_file(RATES_FILE) if os.path.exists(RATES_FILE) else RateBook([DEFAULT_SCHEDULE])
+
+def main(argv=None):
+    """
+    Prices comma-separated mail items from the command line, or prints a rate schedule.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success.
+    """
+    parser = argparse.ArgumentParser(description="Price mail with versioned rate schedules.")
+    parser.add_argument('items', nargs='*', help="length,height,thickness,start zip,end zip")
+    parser.add_argument('--rates', help="JSON file of rate schedules")
+    parser.add_argument('--date', help="shipping date (YYYY-MM-DD); defaults to today")
+    parser.add_argument('--show', action='store_true', help="print the cost table in effect")
+    args = parser.parse_args(argv)
+
+    book = RateBook.from_file(args.rates) if args.rates else rate_book
+    if args.show:
+        rates = book.schedule_for(args.date)
+        print(f"Rates version {rates.version}, effective {rates.effective}")
+        for name, row in zip(rates.names, rates.cost_matrix()):
+            print(f"{name:<20}" + " ".join(f"{cost:6.2f}" for cost in row))
+    for item in args.items:
+        length, height, thickness, start_zip, end_zip = item.split(',')
+        print(format_postage_cost(book.quote(float(length), float(height), float(thickness),
+                                             start_zip, end_zip, args.date)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+'''
+Author: Bobby Jones
+Date: 10/18/26
+Description: A local asyncio server that quotes postage over plain TCP, one request per line. Requests arriving
+             at the same time are gathered into small batches and priced together with the vectorized batch
+             pricer, and the server keeps latency percentiles and throughput counters. A load generator client
+             is included to benchmark it on one machine.
+Bugs: None
+Sources: https://docs.python.org/3/library/asyncio-stream.html, https://docs.python.org/3/library/asyncio-queue.html
+'''
+
+from collections import deque
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from jones_bobby_postoffice import parse_item, quote
+from jones_bobby_postoffice_batch import format_costs, price_batch
+
+# Default address the server listens on
+HOST = '127.0.0.1'
+PORT = 8525
+
+# A batch is priced once it holds MAX_BATCH requests or its first request has waited MAX_DELAY seconds
+MAX_BATCH = 256
+MAX_DELAY = 0.002
+
+# Number of recent request latencies kept for the percentiles
+LATENCY_WINDOW = 10000
+
+def percentile(samples, fraction):
+    """
+    Finds a percentile of some samples by the nearest-rank method.
+
+    Args:
+        samples (list): The samples.
+        fraction (float): The percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        float: The percentile, or 0.0 if there are no samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(fraction * len(ordered) + 0.5) - 1))]
+
+class ServiceStats:
+    """
+    Request counters and recent latencies for the pricing service.
+
+    Args:
+        window (int): Number of recent latencies kept for the percentiles.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched = 0
+        self.connections = 0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, latency, error=False):
+        """
+        Counts one answered request.
+
+        Args:
+            latency (float): Seconds from reading the request to answering it.
+            error (bool): Whether the answer was an error.
+        """
+        self.requests += 1
+        self.errors += error
+        self.latencies.append(latency)
+
+    def snapshot(self):
+        """
+        Summarizes the counters.
+
+        Returns:
+            dict: Counts, throughput in requests per second and p50/p99 latency in milliseconds.
+        """
+        uptime = time.perf_counter() - self.started
+        latencies = list(self.latencies)
+        return {'requests': self.requests,
+                'errors': self.errors,
+                'batches': self.batches,
+                'mean_batch': round(self.batched / self.batches, 2) if self.batches else 0.0,
+                'connections': self.connections,
+                'uptime_s': round(uptime, 3),
+                'throughput_rps': round(self.requests / uptime, 1) if uptime else 0.0,
+                'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 3)}
+
+class PricingService:
+    """
+    Quotes postage for TCP clients, batching requests that arrive together.
+
+    Each request is a line "length,height,thickness,start zip,end zip" and is
+    answered with one line: the cost as main prints it, UNMAILABLE, or
+    "ERROR <reason>". A STATS line is answered with a JSON object of the
+    counters, and QUIT closes the connection. Answers on a connection come back
+    in the order the requests were sent.
+
+    Args:
+        max_batch (int): Most requests priced in one batch.
+        max_delay (float): Longest a request waits for its batch to fill, in seconds.
+
+    Example:
+        asyncio.run(PricingService().serve('127.0.0.1', 8525))
+    """
+
+    def __init__(self, max_batch=MAX_BATCH, max_delay=MAX_DELAY):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.stats = ServiceStats()
+        self.queue = None
+
+    async def serve(self, host=HOST, port=PORT, ready=None):
+        """
+        Runs the server until it is cancelled.
+
+        Args:
+            host (str): Address to listen on.
+            port (int): Port to listen on; 0 picks a free one.
+            ready (asyncio.Future): Set to the bound port once the server is listening.
+        """
+        self.queue = asyncio.Queue()
+        batcher = asyncio.create_task(self._batch_loop())
+        server = await asyncio.start_server(self._handle, host, port)
+        if ready is not None:
+            ready.set_result(server.sockets[0].getsockname()[1])
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+    async def price(self, row):
+        """
+        Queues one parsed request for the next batch and waits for its answer.
+
+        Args:
+            row (tuple): Values from parse_item.
+
+        Returns:
+            str: The formatted cost, UNMAILABLE, or "ERROR <reason>".
+        """
+        answer = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, answer))
+        return await answer
+
+    async def _batch_loop(self):
+        """
+        Collects queued requests into batches and prices each batch at once.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Take whatever else is already waiting without another timer
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            self.stats.batches += 1
+            self.stats.batched += len(batch)
+            try:
+                results = self._price_rows([row for row, _ in batch])
+            except Exception as error:
+                # Never let one bad batch stop the loop that answers every later request
+                results = [f"ERROR {error}"] * len(batch)
+            for (_, answer), result in zip(batch, results):
+                if not answer.done():
+                    answer.set_result(result)
+
+    def _price_rows(self, rows):
+        """
+        Prices a batch of parsed requests, falling back to one at a time if any of them fails,
+        so only the requests that are actually bad get an error.
+
+        Args:
+            rows (list): Values from parse_item.
+
+        Returns:
+            list: One answer per row.
+        """
+        try:
+            return format_costs(*price_batch(*zip(*rows)))
+        except Exception:
+            results = []
+            for row in rows:
+                try:
+                    results.append(quote(*row))
+                except Exception as error:
+                    results.append(f"ERROR {error}")
+            return results
+
+    @staticmethod
+    async def _read_line(reader):
+        """
+        Reads one request line, skipping the whole of a line longer than the reader's limit.
+
+        Returns:
+            bytes: The line, empty at the end of the connection, or None for a line that was too long.
+        """
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as error:
+            return error.partial
+        except asyncio.LimitOverrunError as error:
+            consumed = error.consumed
+        while True:
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b"\n")
+                return None
+            except asyncio.IncompleteReadError:
+                return None
+            except asyncio.LimitOverrunError as error:
+                consumed = error.consumed
+
+    async def _handle(self, reader, writer):
+        """
+        Answers every request line on one connection.
+        """
+        self.stats.connections += 1
+        try:
+            while True:
+                line = await self._read_line(reader)
+                started = time.perf_counter()
+                if line is None:
+                    writer.write(b"ERROR Request line is too long\n")
+                    self.stats.record(time.perf_counter() - started, True)
+                    await writer.drain()
+                    continue
+                if not line:
+                    break
+                request = line.decode('ascii', 'replace').strip()
+                if not request:
+                    continue
+                command = request.upper()
+                if command == 'QUIT':
+                    break
+                if command == 'STATS':
+                    writer.write(json.dumps(self.stats.snapshot()).encode('ascii') + b"\n")
+                    await writer.drain()
+                    continue
+
+                try:
+                    answer = await self.price(parse_item(request))
+                except ValueError as error:
+                    answer = f"ERROR {error}"
+                # Error messages can echo undecodable request bytes, so never let them break the reply
+                writer.write(answer.encode('ascii', 'replace') + b"\n")
+                self.stats.record(time.perf_counter() - started, answer.startswith("ERROR"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.stats.connections -= 1
+            writer.close()
+
+def random_request(rng):
+    """
+    Makes up a plausible quote request for load testing.
+
+    Args:
+        rng (random.Random): Source of randomness.
+
+    Returns:
+        str: A request line without the newline.
+    """
+    length = rng.choice([4.0, 5.5, 9.5, 12.0, rng.uniform(3, 40)])
+    height = rng.choice([5.0, 10.0, 12.0, rng.uniform(3, 30)])
+    thickness = rng.choice([0.01, 0.2, 0.3, rng.uniform(0, 10)])
+    return f"{length:.3f},{height:.3f},{thickness:.3f},{rng.randint(1, 99999)},{rng.randint(1, 99999)}"
+
+async def _client(host, port, requests, seed, latencies):
+    """
+    Sends requests one after another on one connection, timing each answer.
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    for _ in range(requests):
+        started = time.perf_counter()
+        writer.write(random_request(rng).encode('ascii') + b"\n")
+        await writer.drain()
+        await reader.readline()
+        latencies.append(time.perf_counter() - started)
+    writer.write(b"QUIT\n")
+    await writer.drain()
+    writer.close()
+
+async def run_load(host=HOST, port=PORT, connections=50, requests=1000, seed=0):
+    """
+    Benchmarks a running pricing service with many concurrent clients.
+
+    Args:
+        host (str): Server address.
+        port (int): Server port.
+        connections (int): Number of clients sending at the same time.
+        requests (int): Requests sent by each client.
+        seed (int): Seed for the random requests.
+
+    Returns:
+        dict: Client-side throughput and p50/p99 latency, plus the server's STATS.
+    """
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, requests, seed + client, latencies)
+                           for client in range(connections)))
+    elapsed = time.perf_counter() - started
+
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"STATS\nQUIT\n")
+    await writer.drain()
+    server_stats = json.loads(await reader.readline())
+    writer.close()
+    return {'requests': len(latencies),
+            'elapsed_s': round(elapsed, 3),
+            'throughput_rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+            'server': server_stats}
+
+async def _bench_local(args):
+    """
+    Starts a server in this process on a free port and benchmarks it.
+    """
+    service = PricingService(args.max_batch, args.max_delay)
+    ready = asyncio.get_running_loop().create_future()
+    server = asyncio.create_task(service.serve(args.host, 0, ready))
+    port = await ready
+    try:
+        return await run_load(args.host, port, args.connections, args.requests, args.seed)
+    finally:
+        server.cancel()
+
+def main(argv=None):
+    """
+    Runs the pricing service, or benchmarks one.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success.
+    """
+    parser = argparse.ArgumentParser(description="Batching postage pricing service.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="run the server")
+    bench = commands.add_parser('bench', help="benchmark a server with concurrent clients")
+    for command in (serve, bench):
+        command.add_argument('--host', default=HOST, help="address to listen on or connect to")
+        command.add_argument('--port', type=int, default=PORT, help="port to listen on or connect to")
+        command.add_argument('--max-batch', type=int, default=MAX_BATCH, help="most requests per batch")
+        command.add_argument('--max-delay', type=float, default=MAX_DELAY, help="longest wait for a batch, seconds")
+    bench.add_argument('-c', '--connections', type=int, default=50, help="concurrent clients")
+    bench.add_argument('-n', '--requests', type=int, default=1000, help="requests per client")
+    bench.add_argument('--seed', type=int, default=0, help="seed for the random requests")
+    bench.add_argument('--local', action='store_true', help="start a server in this process instead of connecting")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(PricingService(args.max_batch, args.max_delay).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.local:
+        result = asyncio.run(_bench_local(args))
+    else:
+        result = asyncio.run(run_load(args.host, args.port, args.connections, args.requests, args.seed))
+    print(json.dumps(result, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+Author: Bobby Jones
+Date: 10/18/26
+Description: Compares the word frequencies of any number of speakers side by side. Every speaker's table is
+             aligned onto one shared vocabulary as a count matrix, and relative frequencies, log-odds ratios and
+             TF-IDF are worked out with NumPy array operations. Results save to one wide CSV or a .npz file.
+Bugs: None
+Sources: https://numpy.org/doc/stable/reference/generated/numpy.unique.html,
+         Monroe, Colaresi & Quinn (2008), "Fightin' Words" (log-odds ratio with an informative Dirichlet prior),
+         https://en.wikipedia.org/wiki/Tf%E2%80%93idf
+"""
+
+from collections import namedtuple
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from jones_bobby_electiondata import count_corpus, default_tokenizer
+from jones_bobby_countcache import CountCache
+
+# Everything compare() works out; matrices have one row per speaker and one column per vocabulary word
+Comparison = namedtuple('Comparison', ['speakers', 'vocabulary', 'counts', 'relative', 'log_odds', 'tfidf'])
+
+# Words written to the wide CSV per block, so only a slice of each matrix is ever dense at once
+CSV_BLOCK = 10000
+
+def align(tables):
+    """
+    Lines up several speakers' word frequency tables on one shared vocabulary.
+
+    The vocabulary is found with np.unique over every speaker's words at
+    once, rather than by merging the tables word by word. The words are kept
+    in an object array, so one very long token doesn't widen every entry the
+    way a fixed-width string array would.
+
+    Args:
+        tables (dict): Speaker name to a word frequency dictionary.
+
+    Returns:
+        tuple: (speakers list, sorted vocabulary object array, row and column
+        index arrays, counts array) describing the nonzero cells of the count matrix.
+    """
+    speakers = list(tables)
+    sizes = [len(tables[speaker]) for speaker in speakers]
+    words = np.empty(sum(sizes), dtype=object)
+    words[:] = [word for speaker in speakers for word in tables[speaker]]
+    counts = np.concatenate([np.fromiter(tables[speaker].values(), dtype=np.int64, count=size)
+                             for speaker, size in zip(speakers, sizes)] or [np.zeros(0, np.int64)])
+    vocabulary, columns = np.unique(words, return_inverse=True)
+    rows = np.repeat(np.arange(len(speakers)), sizes)
+    return speakers, vocabulary, rows, columns.ravel(), counts
+
+def count_matrix(tables, sparse=False):
+    """
+    Builds the speaker by word count matrix.
+
+    Args:
+        tables (dict): Speaker name to a word frequency dictionary.
+        sparse (bool): Return a scipy.sparse CSR matrix instead of a dense array.
+
+    Returns:
+        tuple: (speakers list, vocabulary array, count matrix).
+    """
+    speakers, vocabulary, rows, columns, counts = align(tables)
+    shape = (len(speakers), len(vocabulary))
+    if sparse:
+        from scipy import sparse as scipy_sparse
+
+        return speakers, vocabulary, scipy_sparse.csr_matrix((counts, (rows, columns)), shape=shape)
+    matrix = np.zeros(shape, dtype=np.int64)
+    matrix[rows, columns] = counts
+    return speakers, vocabulary, matrix
+
+def relative_frequencies(matrix):
+    """
+    Divides each speaker's counts by that speaker's total number of words.
+
+    Args:
+        matrix: Dense or sparse speaker by word count matrix.
+
+    Returns:
+        The relative frequencies, dense or sparse to match the input.
+    """
+    totals = np.asarray(matrix.sum(axis=1), dtype=float).ravel()
+    totals[totals == 0] = 1
+    scale = (1 / totals)[:, None]
+    if isinstance(matrix, np.ndarray):
+        return matrix * scale
+    return matrix.multiply(scale).tocsr()
+
+def log_odds(matrix, prior=0.01):
+    """
+    Scores how much more each speaker uses each word than everyone else does.
+
+    This is the log-odds ratio with an informative Dirichlet prior, divided by
+    its standard error (a z-score): each speaker is compared against the
+    pooled counts of all the other speakers, and the prior for each word is
+    proportional to its overall frequency. Large positive scores mark a
+    speaker's distinctive words.
+
+    Args:
+        matrix: Dense or sparse speaker by word count matrix.
+        prior (float): Prior pseudo-count per occurrence of a word in the whole corpus.
+
+    Returns:
+        numpy.ndarray: Dense speaker by word z-scores.
+    """
+    word_totals = np.asarray(matrix.sum(axis=0), dtype=float).ravel()
+    alpha = prior * word_totals
+    alpha_total = alpha.sum()
+    speaker_totals = np.asarray(matrix.sum(axis=1), dtype=float).ravel()
+    corpus_total = speaker_totals.sum()
+
+    scores = np.empty(matrix.shape)
+    for row in range(matrix.shape[0]):
+        # One pass per speaker keeps a sparse matrix from being densified all at once
+        own = np.asarray(matrix[row].todense() if hasattr(matrix, 'todense') else matrix[row],
+                         dtype=float).ravel()
+        rest = word_totals - own
+        own_total = speaker_totals[row]
+        rest_total = corpus_total - own_total
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # A word used by only one speaker in a one-word corpus has no finite odds
+            delta = (np.log((own + alpha) / (own_total + alpha_total - own - alpha))
+                     - np.log((rest + alpha) / (rest_total + alpha_total - rest - alpha)))
+            scores[row] = delta / np.sqrt(1 / (own + alpha) + 1 / (rest + alpha))
+    return scores
+
+def tfidf(matrix):
+    """
+    Weights each speaker's relative word frequencies by how few speakers use the word.
+
+    Uses the smoothed inverse document frequency log((1 + S) / (1 + df)) + 1,
+    treating each speaker as one document.
+
+    Args:
+        matrix: Dense or sparse speaker by word count matrix.
+
+    Returns:
+        TF-IDF weights, dense or sparse to match the input.
+    """
+    speakers = matrix.shape[0]
+    document_frequency = np.asarray((matrix > 0).sum(axis=0), dtype=float).ravel()
+    idf = np.log((1 + speakers) / (1 + document_frequency)) + 1
+    relative = relative_frequencies(matrix)
+    if isinstance(relative, np.ndarray):
+        return relative * idf
+    return relative.multiply(idf).tocsr()
+
+def compare(tables, sparse=False, prior=0.01):
+    """
+    Compares several speakers' word frequencies.
+
+    Args:
+        tables (dict): Speaker name to a word frequency dictionary.
+        sparse (bool): Keep counts, relative frequencies and TF-IDF as scipy.sparse
+            matrices, which saves memory for very large vocabularies.
+        prior (float): Prior strength for the log-odds ratios.
+
+    Returns:
+        Comparison: The aligned counts and every measure.
+
+    Example:
+        documents, speakers = count_corpus('speeches/')
+        save_comparison_csv(compare(speakers), 'comparison.csv')
+    """
+    speakers, vocabulary, counts = count_matrix(tables, sparse)
+    return Comparison(speakers, vocabulary, counts, relative_frequencies(counts),
+                      log_odds(counts, prior), tfidf(counts))
+
+def _column_blocks(matrix, order, block_size=CSV_BLOCK):
+    """
+    Yields a matrix's columns in a given order as dense blocks of block_size columns.
+
+    Args:
+        matrix: Dense or sparse speaker by word matrix.
+        order (numpy.ndarray): Column indexes in the order wanted.
+        block_size (int): Columns per block.
+
+    Yields:
+        numpy.ndarray: Dense speaker by block_size slices.
+    """
+    if hasattr(matrix, 'tocsc'):
+        # Reordered once as CSC, so each block is a cheap slice of contiguous columns
+        matrix = matrix.tocsc()[:, order]
+        for start in range(0, len(order), block_size):
+            yield matrix[:, start:start + block_size].toarray()
+    else:
+        matrix = np.asarray(matrix)
+        for start in range(0, len(order), block_size):
+            yield matrix[:, order[start:start + block_size]]
+
+def save_comparison_csv(comparison, filename, block_size=CSV_BLOCK):
+    """
+    Saves a comparison as one wide CSV file, most frequent words first.
+
+    Each word gets one row; each speaker gets Count, RelFreq, LogOdds and
+    TFIDF columns. Rows are written block_size words at a time, so memory
+    stays at a few dense blocks even for million-word vocabularies.
+
+    Args:
+        comparison (Comparison): The result of compare().
+        filename (str): The name of the CSV file to save.
+        block_size (int): Words written per block.
+    """
+    order = np.argsort(-np.asarray(comparison.counts.sum(axis=0)).ravel(), kind='stable')
+    measures = [comparison.counts, comparison.relative, comparison.log_odds, comparison.tfidf]
+
+    header = ["Word"]
+    for speaker in comparison.speakers:
+        header += [f"{speaker} Count", f"{speaker} RelFreq", f"{speaker} LogOdds", f"{speaker} TFIDF"]
+    with open(filename, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(header)
+        blocks = zip(*(_column_blocks(matrix, order, block_size) for matrix in measures))
+        for start, (counts, relative, scores, weights) in zip(range(0, len(order), block_size), blocks):
+            words = comparison.vocabulary[order[start:start + block_size]].tolist()
+            # One list per word of each speaker's four measures, side by side
+            columns = zip(counts.astype(np.int64).T.tolist(), relative.T.tolist(),
+                          scores.T.tolist(), weights.T.tolist())
+            writer.writerows([word] + [value for measures in zip(*cells) for value in measures]
+                             for word, cells in zip(words, columns))
+
+def save_comparison_npz(comparison, filename):
+    """
+    Saves a comparison as a .npz archive, keeping sparse matrices sparse.
+
+    Args:
+        comparison (Comparison): The result of compare().
+        filename (str): The name of the .npz file to save.
+    """
+    # The vocabulary is saved as newline-separated UTF-8, since object arrays would need pickling
+    arrays = {'speakers': np.array(comparison.speakers, dtype=str),
+              'vocabulary_text': np.frombuffer("\n".join(comparison.vocabulary.tolist()).encode('utf-8'),
+                                               dtype=np.uint8),
+              'log_odds': comparison.log_odds}
+    for name in ('counts', 'relative', 'tfidf'):
+        matrix = getattr(comparison, name)
+        if isinstance(matrix, np.ndarray):
+            arrays[name] = matrix
+        else:
+            arrays[f'{name}_data'] = matrix.data
+            arrays[f'{name}_indices'] = matrix.indices
+            arrays[f'{name}_indptr'] = matrix.indptr
+    np.savez(filename, **arrays)
+
+def load_comparison(filename):
+    """
+    Loads a comparison saved by save_comparison_npz.
+
+    Args:
+        filename (str): The name of the .npz file.
+
+    Returns:
+        Comparison: The saved comparison.
+    """
+    with np.load(filename, allow_pickle=False) as archive:
+        speakers = archive['speakers'].tolist()
+        if 'vocabulary_text' in archive.files:
+            text = archive['vocabulary_text'].tobytes().decode('utf-8')
+            vocabulary = np.empty(len(text.split("\n")) if text else 0, dtype=object)
+            vocabulary[:] = text.split("\n") if text else []
+        else:
+            vocabulary = archive['vocabulary']
+        shape = (len(speakers), len(vocabulary))
+        matrices = {}
+        for name in ('counts', 'relative', 'tfidf'):
+            if name in archive.files:
+                matrices[name] = archive[name]
+            else:
+                from scipy import sparse as scipy_sparse
+
+                matrices[name] = scipy_sparse.csr_matrix(
+                    (archive[f'{name}_data'], archive[f'{name}_indices'], archive[f'{name}_indptr']),
+                    shape=shape)
+        return Comparison(speakers, vocabulary, matrices['counts'], matrices['relative'],
+                          archive['log_odds'], matrices['tfidf'])
+
+def main(argv=None):
+    """
+    Compares every speaker in a corpus and saves the result.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success.
+    """
+    parser = argparse.ArgumentParser(description="Compare word usage across speakers.")
+    parser.add_argument('corpus', nargs='+', help="corpus directory (one subdirectory per speaker) or speech files")
+    parser.add_argument('-o', '--output', default='comparison.csv', help="wide CSV file to write")
+    parser.add_argument('--npz', help="also save the matrices to this .npz file")
+    parser.add_argument('--sparse', action='store_true', help="use sparse matrices (needs scipy)")
+    parser.add_argument('--cache', help="directory of cached per-speech counts")
+    parser.add_argument('-w', '--workers', type=int, help="worker processes for counting")
+    args = parser.parse_args(argv)
+
+    corpus = args.corpus[0] if len(args.corpus) == 1 else args.corpus
+    cache = CountCache(args.cache, default_tokenizer) if args.cache else None
+    documents, speakers = count_corpus(corpus, workers=args.workers, cache=cache)
+    comparison = compare(speakers, sparse=args.sparse)
+    save_comparison_csv(comparison, args.output)
+    if args.npz:
+        save_comparison_npz(comparison, args.npz)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
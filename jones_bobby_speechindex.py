@@ -0,0 +1,323 @@
+"""
+Author: Bobby Jones
+Date: 10/18/26
+Description: Builds an inverted index over speech transcripts so you can look up where a word or phrase was said
+             (which speech, which line, which word of the line) and print it in context, without rescanning the
+             text. Postings are sorted (speech, word position) keys in a flat array on disk, memory-mapped when
+             the index is opened and binary searched in place, so phrase queries never decode a common word's list.
+Bugs: None
+Sources: https://en.wikipedia.org/wiki/Inverted_index, https://en.wikipedia.org/wiki/Key_Word_in_Context
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from itertools import groupby
+import argparse
+import json
+import locale
+import mmap
+import os
+import sys
+
+from jones_bobby_electiondata import Tokenizer, corpus_files, default_tokenizer
+
+# Format of the files build_index writes; indexes in any other format must be rebuilt
+FORMAT_VERSION = 2
+
+# A posting packs the document into the high 32 bits and the word's position in the document into the low 32
+POSITION_BITS = 32
+POSITION_MASK = (1 << POSITION_BITS) - 1
+
+# One occurrence of a word: which document, which line (1-based) and which word of that line (0-based)
+Hit = namedtuple('Hit', ['doc', 'line', 'offset'])
+
+# One keyword-in-context result
+Concordance = namedtuple('Concordance', ['path', 'line', 'left', 'match', 'right'])
+
+def build_index(corpus, index_dir, tokenizer=None):
+    """
+    Indexes every word of every speech in a corpus and saves the index to a directory.
+
+    Every word is indexed, stop words included, so phrases such as
+    "secure the border" can be found. Words are numbered through each whole
+    document, not per line, so a phrase that wraps onto the next line is
+    still found, the same way jones_bobby_ngrams counts it. Each word's
+    postings are stored as sorted 64-bit (document, position) keys, which can
+    be binary searched where they lie in the memory-mapped file. For every
+    line the position of its first word and its byte offset are kept too, to
+    turn positions back into lines and to seek straight to them.
+
+    Args:
+        corpus (str or list): A directory, or a list of file paths and glob patterns.
+        index_dir (str): Directory to write the index to; created if missing.
+        tokenizer (Tokenizer): How to split words.
+
+    Returns:
+        SpeechIndex: The new index, opened for queries.
+    """
+    tokenizer = tokenizer or default_tokenizer
+    encoding = locale.getpreferredencoding(False)
+    documents = corpus_files(corpus)
+    postings = defaultdict(lambda: array('Q'))
+    line_starts = array('Q')
+    line_offsets = array('Q')
+    document_lines = []
+
+    for doc, file_path in enumerate(documents):
+        base = doc << POSITION_BITS
+        position = byte_offset = 0
+        first_line = len(line_starts)
+        with open(file_path, 'rb') as f:
+            for raw_line in f:
+                line_starts.append(position)
+                line_offsets.append(byte_offset)
+                byte_offset += len(raw_line)
+                for word in tokenizer.tokenize(raw_line.decode(encoding)):
+                    postings[word].append(base | position)
+                    position += 1
+        document_lines.append([first_line, len(line_starts) - first_line])
+
+    os.makedirs(index_dir, exist_ok=True)
+    vocabulary = {}
+    start = 0
+    with open(os.path.join(index_dir, 'postings.bin'), 'wb') as f:
+        for word in sorted(postings):
+            entries = postings.pop(word)
+            entries.tofile(f)
+            vocabulary[word] = [start, len(entries)]
+            start += len(entries)
+    with open(os.path.join(index_dir, 'lines.bin'), 'wb') as f:
+        line_starts.tofile(f)
+        line_offsets.tofile(f)
+    with open(os.path.join(index_dir, 'index.json'), 'w') as f:
+        json.dump({'version': FORMAT_VERSION,
+                   'documents': [os.path.abspath(path) for path in documents],
+                   'document_lines': document_lines,
+                   'encoding': encoding,
+                   'unicode_punctuation': tokenizer.unicode_punctuation,
+                   'vocabulary': vocabulary}, f)
+    return SpeechIndex(index_dir, tokenizer)
+
+class SpeechIndex:
+    """
+    A saved inverted index over speech transcripts, opened for queries.
+
+    The postings file is memory-mapped, so opening an index is quick and only
+    the postings of the words asked about are ever read. Phrases are matched
+    by walking the rarest word's postings and binary searching the others'
+    where they lie, so a common word's postings are never decoded in full.
+
+    Args:
+        index_dir (str): Directory written by build_index.
+        tokenizer (Tokenizer): How to split query words; defaults to one with the
+            punctuation setting the index was built with.
+
+    Raises:
+        ValueError: If the index was written in an older format.
+
+    Example:
+        index = SpeechIndex('speech_index')
+        for entry in index.concordance('border'):
+            print(entry.path, entry.line, entry.left, entry.match, entry.right)
+    """
+
+    def __init__(self, index_dir, tokenizer=None):
+        with open(os.path.join(index_dir, 'index.json'), 'r') as f:
+            meta = json.load(f)
+        if meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{index_dir} is an index in an older format; build it again")
+        self.tokenizer = tokenizer or Tokenizer(unicode_punctuation=meta['unicode_punctuation'])
+        self.documents = meta['documents']
+        self.document_lines = meta['document_lines']
+        self.encoding = meta['encoding']
+        self.vocabulary = meta['vocabulary']
+
+        lines = array('Q')
+        with open(os.path.join(index_dir, 'lines.bin'), 'rb') as f:
+            lines.frombytes(f.read())
+        half = len(lines) // 2
+        self.line_starts, self.line_offsets = lines[:half], lines[half:]
+
+        self._file = open(os.path.join(index_dir, 'postings.bin'), 'rb')
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._postings = memoryview(self._map).cast('Q')
+        else:
+            self._map = None
+            self._postings = memoryview(b'').cast('Q')
+
+    def close(self):
+        """
+        Releases the memory-mapped postings file.
+        """
+        self._postings.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _keys(self, word):
+        """Returns a word's sorted (document, position) keys as a slice of the mapped postings."""
+        start, length = self.vocabulary.get(word, (0, 0))
+        return self._postings[start:start + length]
+
+    def _line_index(self, doc, position):
+        """Finds the index into line_starts of the line holding a word position of a document."""
+        first, count = self.document_lines[doc]
+        return bisect_right(self.line_starts, position, first, first + count) - 1
+
+    def _hit(self, key):
+        """Turns a (document, position) key into a Hit."""
+        doc, position = key >> POSITION_BITS, key & POSITION_MASK
+        line = self._line_index(doc, position)
+        return Hit(doc, line - self.document_lines[doc][0] + 1, position - self.line_starts[line])
+
+    def lookup(self, word):
+        """
+        Finds every occurrence of a single word.
+
+        Args:
+            word (str): The word to find; punctuation and case are ignored.
+
+        Returns:
+            list: Hit tuples in document and line order.
+        """
+        words = self.tokenizer.tokenize(word)
+        if len(words) != 1:
+            return []
+        return [self._hit(key) for key in self._keys(words[0]).tolist()]
+
+    def _phrase_keys(self, words):
+        """
+        Finds the (document, position) key of the first word of every occurrence of a phrase.
+        """
+        if not words:
+            return []
+        postings = [self._keys(word) for word in words]
+        # Start from the rarest word so the fewest candidates are checked
+        rarest = min(range(len(words)), key=lambda i: len(postings[i]))
+        others = [(i - rarest, postings[i]) for i in range(len(words)) if i != rarest]
+        # Candidates come in order, so each word's search carries on from where its last one stopped
+        cursors = [0] * len(others)
+
+        matches = []
+        for key in postings[rarest].tolist():
+            if key & POSITION_MASK < rarest:
+                continue
+            for k, (shift, keys) in enumerate(others):
+                wanted = key + shift
+                cursors[k] = bisect_left(keys, wanted, cursors[k])
+                if cursors[k] == len(keys) or keys[cursors[k]] != wanted:
+                    break
+            else:
+                matches.append(key - rarest)
+        return matches
+
+    def phrase(self, text):
+        """
+        Finds every occurrence of a phrase, including ones that run onto the next line.
+
+        Args:
+            text (str): The phrase to find; punctuation and case are ignored.
+
+        Returns:
+            list: Hit tuples for the first word of each match.
+        """
+        return [self._hit(key) for key in self._phrase_keys(self.tokenizer.tokenize(text))]
+
+    def count(self, text):
+        """
+        Counts the occurrences of a word or phrase.
+
+        Args:
+            text (str): The word or phrase.
+
+        Returns:
+            int: Number of occurrences across the corpus.
+        """
+        return len(self._phrase_keys(self.tokenizer.tokenize(text)))
+
+    def documents_with(self, text):
+        """
+        Lists the speeches that contain a word or phrase.
+
+        Args:
+            text (str): The word or phrase.
+
+        Returns:
+            list: The file paths, in corpus order.
+        """
+        docs = {key >> POSITION_BITS for key in self._phrase_keys(self.tokenizer.tokenize(text))}
+        return [self.documents[doc] for doc in sorted(docs)]
+
+    def concordance(self, text, width=5):
+        """
+        Shows each occurrence of a word or phrase with the words around it (keyword in context).
+
+        Only the lines that contain a match are read back from the speeches,
+        by seeking to their saved byte offsets. Context is taken from the
+        lines the match starts and ends on.
+
+        Args:
+            text (str): The word or phrase.
+            width (int): Number of words of context on each side.
+
+        Returns:
+            list: Concordance tuples of (path, line, left, match, right).
+        """
+        words = self.tokenizer.tokenize(text)
+        size = len(words)
+        results = []
+        for doc, keys in groupby(self._phrase_keys(words), key=lambda key: key >> POSITION_BITS):
+            path = self.documents[doc]
+            first = self.document_lines[doc][0]
+            with open(path, 'rb') as f:
+                for key in keys:
+                    position = key & POSITION_MASK
+                    start_line = self._line_index(doc, position)
+                    end_line = self._line_index(doc, position + size - 1)
+                    f.seek(self.line_offsets[start_line])
+                    line_words = []
+                    for _ in range(end_line - start_line + 1):
+                        line_words += self.tokenizer.tokenize(f.readline().decode(self.encoding))
+                    offset = position - self.line_starts[start_line]
+                    results.append(Concordance(path, start_line - first + 1,
+                                               " ".join(line_words[max(0, offset - width):offset]),
+                                               " ".join(line_words[offset:offset + size]),
+                                               " ".join(line_words[offset + size:offset + size + width])))
+        return results
+
+def main(argv=None):
+    """
+    Builds a speech index, or prints the concordance for a word or phrase from one.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success.
+    """
+    parser = argparse.ArgumentParser(description="Index speeches and search them for words and phrases.")
+    parser.add_argument('index_dir', help="directory holding the index")
+    parser.add_argument('--build', nargs='+', metavar='SPEECH', help="speech files, globs or a directory to index")
+    parser.add_argument('--find', help="word or phrase to show in context")
+    parser.add_argument('--width', type=int, default=5, help="words of context on each side")
+    args = parser.parse_args(argv)
+
+    if args.build:
+        corpus = args.build[0] if len(args.build) == 1 else args.build
+        build_index(corpus, args.index_dir).close()
+    if args.find:
+        with SpeechIndex(args.index_dir) as index:
+            for entry in index.concordance(args.find, args.width):
+                print(f"{entry.path}:{entry.line}: {entry.left:>40} [{entry.match}] {entry.right}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Author: Bobby Jones
+Date: 10/18/26
+Description: Approximate, fixed-memory word frequency counting for speech archives too large to count exactly.
+             A Count-Min Sketch estimates every word's frequency and a Misra-Gries summary tracks the most
+             frequent words, so the heavy hitters can be saved with the same save_to_csv as exact counts.
+Bugs: None
+Sources: https://en.wikipedia.org/wiki/Count%E2%80%93min_sketch, https://en.wikipedia.org/wiki/Misra%E2%80%93Gries_summary
+"""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
+import heapq
+import math
+import sys
+
+from jones_bobby_electiondata import default_tokenizer, expand_paths, save_to_csv
+
+class CountMinSketch:
+    """
+    Estimates how often each word has been seen using a fixed-size table of counters.
+
+    Estimates never undercount. With probability at least 1 - delta an
+    estimate overcounts by at most epsilon times the total number of words
+    added. Words are hashed with BLAKE2b rather than hash(), so sketches built
+    in different processes agree and can be merged.
+
+    Args:
+        width (int): Number of counters per row.
+        depth (int): Number of rows, each using a different hash.
+
+    Example:
+        sketch = CountMinSketch.from_error(epsilon=0.001, delta=0.01)
+        sketch.add('border', 3)
+        sketch['border']  # at least 3
+    """
+
+    def __init__(self, width, depth):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.table = array('Q', bytes(8 * width * depth))
+
+    @classmethod
+    def from_error(cls, epsilon, delta):
+        """
+        Sizes a sketch for an error bound.
+
+        Args:
+            epsilon (float): Maximum overcount, as a fraction of all words added.
+            delta (float): Probability that an estimate exceeds that bound.
+
+        Returns:
+            CountMinSketch: An empty sketch with width ceil(e / epsilon) and depth ceil(ln(1 / delta)).
+        """
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)))
+
+    def _cells(self, word):
+        """
+        Finds the counter in each row that a word maps to.
+
+        Args:
+            word (str): The word to hash.
+
+        Returns:
+            generator: One index into self.table per row.
+        """
+        digest = hashlib.blake2b(word.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        width = self.width
+        return (row * width + (first + row * second) % width for row in range(self.depth))
+
+    def add(self, word, count=1):
+        """
+        Records count more occurrences of a word.
+
+        Args:
+            word (str): The word seen.
+            count (int): How many times it was seen.
+        """
+        table = self.table
+        for cell in self._cells(word):
+            table[cell] += count
+        self.total += count
+
+    def __getitem__(self, word):
+        table = self.table
+        return min(table[cell] for cell in self._cells(word))
+
+    def merge(self, other):
+        """
+        Adds another sketch's counts into this one.
+
+        Args:
+            other (CountMinSketch): A sketch with the same width and depth.
+
+        Returns:
+            CountMinSketch: This sketch.
+        """
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Only sketches with the same width and depth can be merged")
+        self.table = array('Q', map(sum, zip(self.table, other.table)))
+        self.total += other.total
+        return self
+
+    @property
+    def memory_bytes(self):
+        """int: Size of the counter table in bytes."""
+        return self.table.itemsize * len(self.table)
+
+class HeavyHitters:
+    """
+    Tracks the most frequent words in a stream with a bounded number of counters (Misra-Gries).
+
+    Every word that makes up more than 1 / (capacity + 1) of the stream is
+    guaranteed to be kept. Counters are pruned in batches once there are
+    twice as many as the capacity, so each update is amortized constant time.
+
+    Args:
+        capacity (int): Number of words to keep track of.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counters = {}
+
+    def add(self, word, count=1):
+        """
+        Records count more occurrences of a word.
+
+        Args:
+            word (str): The word seen.
+            count (int): How many times it was seen.
+        """
+        counters = self.counters
+        counters[word] = counters.get(word, 0) + count
+        if len(counters) >= 2 * self.capacity:
+            self._prune()
+
+    def _prune(self):
+        """
+        Subtracts the (capacity + 1)-th largest count from every counter and drops those left at zero.
+        """
+        if len(self.counters) <= self.capacity:
+            return
+        threshold = heapq.nlargest(self.capacity + 1, self.counters.values())[-1]
+        self.counters = {word: count - threshold for word, count in self.counters.items()
+                         if count > threshold}
+
+    def merge(self, other):
+        """
+        Combines another summary into this one.
+
+        Args:
+            other (HeavyHitters): A summary of a different part of the stream.
+
+        Returns:
+            HeavyHitters: This summary.
+        """
+        for word, count in other.counters.items():
+            self.counters[word] = self.counters.get(word, 0) + count
+        self._prune()
+        return self
+
+    def words(self):
+        """
+        Lists the words currently tracked.
+
+        Returns:
+            list: Up to capacity candidate heavy hitters.
+        """
+        self._prune()
+        return list(self.counters)
+
+class ApproximateCounter:
+    """
+    A fixed-memory stand-in for an exact word frequency dictionary.
+
+    A Count-Min Sketch answers frequency queries for any word and a
+    Misra-Gries summary remembers which words are the most frequent.
+    items() yields the heavy hitters with their estimated frequencies, so the
+    counter can be passed directly to save_to_csv.
+
+    Args:
+        epsilon (float): Maximum overcount, as a fraction of all words counted.
+        delta (float): Probability that an estimate exceeds that bound.
+        capacity (int): Number of heavy hitters to track.
+
+    Example:
+        word_freq = sketch_file('kamala_harris_speech.txt')
+        save_to_csv(word_freq, 'harris_top_words.csv', top_k=200)
+    """
+
+    def __init__(self, epsilon=0.0001, delta=0.001, capacity=1000):
+        self.sketch = CountMinSketch.from_error(epsilon, delta)
+        self.heavy_hitters = HeavyHitters(capacity)
+
+    def update(self, word_freq):
+        """
+        Adds a table of exact counts, such as the counts for one block of text.
+
+        Args:
+            word_freq (dict): A dictionary where the keys are words and values are the frequency of each word.
+        """
+        for word, count in word_freq.items():
+            self.sketch.add(word, count)
+            self.heavy_hitters.add(word, count)
+
+    def merge(self, other):
+        """
+        Adds the counts from another counter, such as one built by a separate worker.
+
+        Args:
+            other (ApproximateCounter): A counter with the same error settings.
+
+        Returns:
+            ApproximateCounter: This counter.
+        """
+        self.sketch.merge(other.sketch)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        return self
+
+    def __getitem__(self, word):
+        return self.sketch[word]
+
+    def items(self):
+        """
+        Lists the heavy hitters with their estimated frequencies.
+
+        Returns:
+            list: (word, estimated frequency) pairs.
+        """
+        return [(word, self.sketch[word]) for word in self.heavy_hitters.words()]
+
+    def __len__(self):
+        return len(self.heavy_hitters.words())
+
+    @property
+    def total(self):
+        """int: Total number of words counted."""
+        return self.sketch.total
+
+    @property
+    def error_bound(self):
+        """float: Largest expected overcount of any estimate, in words."""
+        return math.e / self.sketch.width * self.sketch.total
+
+def sketch_file(file_path, tokenizer=None, **settings):
+    """
+    Counts the words in a text file approximately, in memory independent of its vocabulary.
+
+    Each block of the file is counted exactly and then folded into the sketch,
+    so memory is bounded by the sketch plus one block's vocabulary.
+
+    Args:
+        file_path (str): The file path to the text file containing the speech.
+        tokenizer (Tokenizer): How to split and filter words.
+        **settings: epsilon, delta and capacity for the ApproximateCounter.
+
+    Returns:
+        ApproximateCounter: The approximate word frequencies.
+    """
+    tokenizer = tokenizer or default_tokenizer
+    counter = ApproximateCounter(**settings)
+    for block in tokenizer.iter_blocks(file_path):
+        counter.update(tokenizer.count_text(block))
+    return counter
+
+def sketch_corpus(file_paths, workers=None, tokenizer=None, **settings):
+    """
+    Counts the words in many files approximately, one file per worker process, and merges the sketches.
+
+    Args:
+        file_paths (list): The speech files to count.
+        workers (int): Number of worker processes; defaults to one per CPU.
+        tokenizer (Tokenizer): How to split and filter words.
+        **settings: epsilon, delta and capacity for the ApproximateCounter.
+
+    Returns:
+        ApproximateCounter: The approximate word frequencies across every file.
+    """
+    total = ApproximateCounter(**settings)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(sketch_file, file_path, tokenizer, **settings)
+                   for file_path in file_paths]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+def main(argv=None):
+    """
+    Saves the approximate most frequent words across a set of speeches to one CSV file.
+
+    Args:
+        argv (list): Command-line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success.
+    """
+    parser = argparse.ArgumentParser(description="Approximate word frequencies for large speech archives.")
+    parser.add_argument('inputs', nargs='+', help="speech files or glob patterns")
+    parser.add_argument('-o', '--output', default='heavy_hitters.csv', help="CSV file to write")
+    parser.add_argument('--epsilon', type=float, default=0.0001, help="maximum overcount as a fraction of all words")
+    parser.add_argument('--delta', type=float, default=0.001, help="chance of exceeding the overcount bound")
+    parser.add_argument('--capacity', type=int, default=1000, help="number of heavy hitters to track")
+    parser.add_argument('-w', '--workers', type=int, help="worker processes")
+    args = parser.parse_args(argv)
+
+    counter = sketch_corpus(expand_paths(args.inputs), args.workers,
+                            epsilon=args.epsilon, delta=args.delta, capacity=args.capacity)
+    save_to_csv(counter, args.output)
+    print(f"Counted {counter.total} words using {counter.sketch.memory_bytes} bytes of counters; "
+          f"estimates are within {counter.error_bound:.0f} with probability {1 - args.delta}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())